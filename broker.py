@@ -1,12 +1,25 @@
+import json
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
 
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
-from config import API_BASE_URL, API_KEY, SYMBOL
+from clocks import REAL_CLOCK, Clock
+from coalesce import ReadCoalescer, request_key
+from config import (
+    API_BASE_URL,
+    API_KEY,
+    METADATA_CACHE_PATH,
+    METADATA_CACHE_TTL,
+    SEED_STATE_PATH,
+    SYMBOL,
+)
+from pricing import PriceDiscovery
+from transport import Transport
 
 SEED_QTY = 0.1
 EPS = 1e-6
@@ -15,6 +28,15 @@ SEED_INITIAL_DELAY = 1.0
 SEED_BACKOFF = 1.5
 SEED_MAX_DELAY = 5.0
 
+# Seconds a read response may be shared between callers. Any other request
+# (orders) invalidates every cached read.
+READ_FRESHNESS = {
+    ("POST", "/equity/portfolio/ticker"): 0.6,
+    ("GET", "/equity/account/cash"): 2.0,
+    ("GET", "/equity/metadata/instruments"): 300.0,
+    ("GET", "/equity/metadata/exchanges"): 300.0,
+}
+
 
 class BrokerError(Exception):
     """Base exception for broker operations."""
@@ -32,7 +54,9 @@ class MarketDataUnavailable(BrokerError):
     """Raised when price discovery fails after seed attempts."""
 
 
-def _retry_after_seconds(value: str | None) -> float | None:
+def _retry_after_seconds(
+    value: str | None, now: datetime | None = None
+) -> float | None:
     if not value:
         return None
     text = value.strip()
@@ -46,44 +70,78 @@ def _retry_after_seconds(value: str | None) -> float | None:
         retry_at = parsedate_to_datetime(text)
         if retry_at.tzinfo is None:
             retry_at = retry_at.replace(tzinfo=timezone.utc)
-        delta = (retry_at - datetime.now(timezone.utc)).total_seconds()
+        now = now or datetime.now(timezone.utc)
+        delta = (retry_at - now).total_seconds()
         return max(delta, 0.0)
     except (ValueError, TypeError):
         return None
 
 
 class Broker:
-    def __init__(self):
+    def __init__(
+        self,
+        clock: Clock | None = None,
+        state_path: str | None = None,
+        fast_start: bool = False,
+    ):
+        started = time.perf_counter()
+        self.startup_timings = {}
+        self.time_source = clock or REAL_CLOCK
         self.base_url = API_BASE_URL.rstrip("/")
         self.symbol = SYMBOL
-        self.session = requests.Session()
-        adapter = HTTPAdapter(
-            max_retries=Retry(
-                total=5,
-                backoff_factor=0.3,
-                status_forcelist=[429, 500, 502, 503, 504],
-                allowed_methods={"GET", "POST", "DELETE"},
-            )
-        )
-        self.session.mount("https://", adapter)
-        self.session.mount("http://", adapter)
+        self.transport = Transport()
+        self.session = self.transport.session
         auth = (API_KEY or "").strip()
         if auth and not auth.lower().startswith("basic "):
             auth = f"Basic {auth}"
         if auth:
             self.session.headers["Authorization"] = auth
         self.session.headers["Accept"] = "application/json"
-        self.seed_active = False
         self.events = []
-        self._last_position = None
-        self._last_pos_time = 0.0
-        self._load_metadata()
+        self._reads = ReadCoalescer(READ_FRESHNESS, clock=self.time_source.monotonic)
+        self.prices = PriceDiscovery(
+            self._ensure_seed, self.time_source, state_path or SEED_STATE_PATH
+        )
+        self.seed_active = self.prices.seeded(self.symbol)
+        # Set while _ensure_seed runs (possibly on the discovery thread) so the
+        # loop's empty position reads do not clear seed_active under it.
+        self._seed_in_flight = threading.Event()
+        self.startup_timings["session"] = time.perf_counter() - started
+        if fast_start:
+            # Metadata and the price snapshot hit different endpoints and
+            # rate limits, so they can load concurrently.
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                metadata = pool.submit(self._load_metadata)
+                pool.submit(self._prefetch_snapshot)
+                metadata.result()
+        else:
+            self._load_metadata()
+        self.startup_timings["total"] = time.perf_counter() - started
+
+    def _req(self, method, path, *, json=None, allow_404=False, fresh=False):
+        path = path if path.startswith("/") else "/" + path
+        ttl = self._reads.ttl(method, path)
+        if ttl is None:
+            try:
+                return self._send(method, path, json=json, allow_404=allow_404)
+            finally:
+                # A failed order may still have reached the server.
+                self._reads.invalidate()
+        if fresh:
+            self._reads.invalidate(method, path)
+        return self._reads.fetch(
+            request_key(method, path, json),
+            ttl,
+            lambda: self._send(method, path, json=json, allow_404=allow_404),
+        )
 
-    def _req(self, method, path, *, json=None, allow_404=False):
-        url = f"{self.base_url}{path if path.startswith('/') else '/' + path}"
-        resp = self.session.request(method, url, json=json, timeout=10)
+    def _send(self, method, path, *, json=None, allow_404=False):
+        url = f"{self.base_url}{path}"
+        resp = self.transport.request(method, url, path, json=json)
         if resp.status_code == 429:
-            retry_after = _retry_after_seconds(resp.headers.get("Retry-After"))
+            retry_after = _retry_after_seconds(
+                resp.headers.get("Retry-After"), self.time_source.now()
+            )
             message = (
                 f"Rate limit encountered calling {url} "
                 f"(retry_after={retry_after if retry_after is not None else 'unknown'}s)."
@@ -97,33 +155,110 @@ class Broker:
     def _load_metadata(self):
         if self.events:
             return
-        instruments = self._req("GET", "/equity/metadata/instruments").json()
-        inst = next(
-            (row for row in instruments if row.get("ticker") == self.symbol), None
-        )
-        if not inst:
-            raise RuntimeError(f"Ticker {self.symbol} not found.")
-        schedule_id = inst.get("workingScheduleId")
-        exchanges = self._req("GET", "/equity/metadata/exchanges").json()
-        schedule = next(
-            (
-                s
-                for ex in exchanges
-                for s in ex.get("workingSchedules", [])
-                if s.get("id") == schedule_id
-            ),
-            None,
-        )
+        started = time.perf_counter()
+        self.events = self._cached_events()
+        if not self.events:
+            self.events = self._fetch_events()
+            self._save_events()
+        self.startup_timings["metadata"] = time.perf_counter() - started
+
+    def _fetch_events(self):
+        # Both payloads come from separately rate-limited endpoints, so fetch
+        # them side by side; the large instruments list is parsed off-thread.
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            instruments = pool.submit(
+                lambda: self._req("GET", "/equity/metadata/instruments").json()
+            )
+            exchanges = pool.submit(
+                lambda: self._req("GET", "/equity/metadata/exchanges").json()
+            )
+            inst = next(
+                (
+                    row
+                    for row in instruments.result()
+                    if row.get("ticker") == self.symbol
+                ),
+                None,
+            )
+            if not inst:
+                raise RuntimeError(f"Ticker {self.symbol} not found.")
+            schedule_id = inst.get("workingScheduleId")
+            schedule = next(
+                (
+                    s
+                    for ex in exchanges.result()
+                    for s in ex.get("workingSchedules", [])
+                    if s.get("id") == schedule_id
+                ),
+                None,
+            )
         if not schedule:
             raise RuntimeError(f"Schedule {schedule_id} not found for {self.symbol}.")
-        self.events = sorted(
+        return sorted(
             (datetime.fromisoformat(ev["date"].replace("Z", "+00:00")), ev["type"])
             for ev in schedule.get("timeEvents", [])
             if ev.get("date") and ev.get("type")
         )
 
+    def _cached_events(self):
+        """Return schedule events cached on disk if still usable."""
+        path = METADATA_CACHE_PATH
+        if not path or not os.path.exists(path):
+            return []
+        try:
+            with open(path) as handle:
+                entry = json.load(handle).get(self.symbol) or {}
+            events = [
+                (datetime.fromisoformat(stamp), kind)
+                for stamp, kind in entry.get("events", [])
+            ]
+        except (OSError, ValueError, TypeError):
+            return []
+        age = self.time_source.time() - float(entry.get("saved", 0.0))
+        now = self.time_source.now()
+        if age > METADATA_CACHE_TTL or not any(stamp > now for stamp, _ in events):
+            return []
+        return events
+
+    def _save_events(self):
+        path = METADATA_CACHE_PATH
+        if not path:
+            return
+        try:
+            with open(path) as handle:
+                cache = json.load(handle)
+        except (OSError, ValueError):
+            cache = {}
+        cache[self.symbol] = {
+            "saved": self.time_source.time(),
+            "events": [[stamp.isoformat(), kind] for stamp, kind in self.events],
+        }
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w") as handle:
+                json.dump(cache, handle)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            # The cache only speeds up the next start; never fail this one.
+            print(f"Could not write metadata cache {path}: {exc}")
+
+    def _prefetch_snapshot(self):
+        """Record the last-known price; failures are left to the loop.
+
+        Cash and position reads are not primed here: the loop first waits for
+        the open and warms up, so cached snapshots would expire unused.
+        """
+        started = time.perf_counter()
+        try:
+            data = self._position_raw(self.symbol)
+        except (BrokerError, requests.RequestException):
+            data = None
+        if data and data.get("currentPrice") is not None:
+            self.prices.record(self.symbol, float(data["currentPrice"]))
+        self.startup_timings["snapshot"] = time.perf_counter() - started
+
     def clock(self):
-        now = datetime.now(timezone.utc)
+        now = self.time_source.now()
         is_open = False
         next_open = next_close = None
         for stamp, kind in self.events:
@@ -151,14 +286,27 @@ class Broker:
             ),
         }
 
-    def _position_raw(self, symbol):
+    def read_stats(self):
+        """Return hit/miss counters for coalesced reads keyed by endpoint."""
+        return self._reads.stats()
+
+    def transport_stats(self):
+        """Return per-endpoint latency, size and retry stats plus pool reuse."""
+        return self.transport.stats()
+
+    def prewarm(self, connections=2):
+        """Open API connections ahead of the first trading request."""
+        return self.transport.warm(self.base_url, connections)
+
+    def _position_raw(self, symbol, fresh=False):
         resp = self._req(
-            "POST", "/equity/portfolio/ticker", json={"ticker": symbol}, allow_404=True
+            "POST",
+            "/equity/portfolio/ticker",
+            json={"ticker": symbol},
+            allow_404=True,
+            fresh=fresh,
         )
-        data = None if resp.status_code == 404 else resp.json()
-        self._last_position = data
-        self._last_pos_time = time.time()
-        return data
+        return None if resp.status_code == 404 else resp.json()
 
     def _market_order(self, symbol, signed_qty):
         return self._req(
@@ -168,31 +316,66 @@ class Broker:
         ).json()
 
     def _ensure_seed(self, symbol):
-        if not self.seed_active:
-            self._market_order(symbol, SEED_QTY)
-        self.seed_active = True
-        wait_seconds = SEED_INITIAL_DELAY
-        for _ in range(SEED_MAX_ATTEMPTS):
-            time.sleep(wait_seconds)
-            data = self._position_raw(symbol)
-            if data:
-                return data
-            wait_seconds = min(wait_seconds * SEED_BACKOFF, SEED_MAX_DELAY)
-        self.seed_active = False
-        raise MarketDataUnavailable(
-            f"Position snapshot still missing after seeding attempts for {symbol}."
-        )
+        self._seed_in_flight.set()
+        try:
+            if not self.seed_active:
+                self._market_order(symbol, SEED_QTY)
+                self.prices.mark_seeded(symbol, True)
+            self.seed_active = True
+            wait_seconds = SEED_INITIAL_DELAY
+            for _ in range(SEED_MAX_ATTEMPTS):
+                self.time_source.sleep(wait_seconds)
+                data = self._position_raw(symbol)
+                if data:
+                    return data
+                wait_seconds = min(wait_seconds * SEED_BACKOFF, SEED_MAX_DELAY)
+            self.seed_active = False
+            raise MarketDataUnavailable(
+                f"Position snapshot still missing after seeding attempts for {symbol}."
+            )
+        finally:
+            self._seed_in_flight.clear()
+
+    def _clear_seed_flag(self):
+        if not self._seed_in_flight.is_set():
+            self.seed_active = False
 
     def get_latest_bar(self, symbol, timeframe="1m"):
-        """Return a synthetic OHLC bar using the most recent position snapshot."""
+        """Return a synthetic OHLC bar using the most recent position snapshot.
+
+        Only the first discovery of ``symbol`` blocks on seed backoff; a fresh
+        price persisted by an earlier run counts as discovered. After that, a missing position starts a background seed and a cached
+        price younger than ``PRICE_MAX_AGE`` is returned with its original
+        timestamp. Without such a price, or when the last background seed
+        failed, ``MarketDataUnavailable`` is raised instead of waiting.
+        """
         data = self._position_raw(symbol)
+        stamp = self.time_source.time()
         if not data:
-            data = self._ensure_seed(symbol)
-        qty = float(data.get("quantity", 0.0))
-        if qty >= SEED_QTY - EPS:
-            self.seed_active = True
-        price = float(data.get("currentPrice"))
-        ts = datetime.now(timezone.utc).isoformat()
+            self._clear_seed_flag()
+            if not self.prices.known(symbol):
+                data = self._ensure_seed(symbol)
+                stamp = self.time_source.time()
+            else:
+                error = self.prices.pop_error(symbol)
+                if error is not None:
+                    raise MarketDataUnavailable(
+                        f"Background seed failed for {symbol}: {error}"
+                    ) from error
+                cached = self.prices.last_known(symbol)
+                self.prices.start_seed(symbol)
+                if cached is None:
+                    raise MarketDataUnavailable(
+                        f"No recent price for {symbol} while the seed is placed."
+                    )
+                price, stamp = cached
+        if data:
+            qty = float(data.get("quantity", 0.0))
+            if qty >= SEED_QTY - EPS:
+                self.seed_active = True
+            price = float(data.get("currentPrice"))
+            self.prices.record(symbol, price, stamp)
+        ts = datetime.fromtimestamp(stamp, timezone.utc).isoformat()
         return {
             "ts": ts,
             "open": price,
@@ -206,14 +389,10 @@ class Broker:
         return float(self._req("GET", "/equity/account/cash").json().get("total", 0.0))
 
     def position(self, symbol):
-        data = (
-            self._last_position
-            if time.time() - self._last_pos_time < 0.6
-            else self._position_raw(symbol)
-        )
+        data = self._position_raw(symbol)
         qty = float((data or {}).get("quantity", 0.0))
         if not data or abs(qty) < EPS:
-            self.seed_active = False
+            self._clear_seed_flag()
             return 0.0
         if qty >= SEED_QTY - EPS or self.seed_active or qty <= -SEED_QTY - EPS:
             self.seed_active = True
@@ -235,18 +414,24 @@ class Broker:
         return True
 
     def _drop_seed(self):
-        if not self.seed_active:
+        # The persisted flag also covers a seed order whose fill was never
+        # confirmed before seeding gave up.
+        if not (self.seed_active or self.prices.seeded(self.symbol)):
             return
-        data = self._position_raw(self.symbol)
+        data = self._position_raw(self.symbol, fresh=True)
         qty = 0.0 if not data else float(data.get("quantity", 0.0))
         if abs(qty - SEED_QTY) < 0.01:
             self._market_order(self.symbol, -SEED_QTY)
-            time.sleep(1.05)
         self.seed_active = False
-        self._last_position = None
+        self.prices.mark_seeded(self.symbol, False)
 
-    def close(self):
+    def close(self, drop_seed=True):
+        """Release the session; keep the seed when a restart will reuse it."""
         try:
-            self._drop_seed()
+            # Let a background seed finish first so its order is dropped too.
+            self.prices.close()
+            if drop_seed:
+                self._drop_seed()
+            self.prices.save()
         finally:
-            self.session.close()
+            self.transport.close()
@@ -0,0 +1,79 @@
+"""Injectable time sources for the trading loop and broker."""
+
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+
+class Clock(ABC):
+    """Wall time, monotonic time, and sleeping behind one interface."""
+
+    @abstractmethod
+    def time(self) -> float: ...
+
+    @abstractmethod
+    def monotonic(self) -> float: ...
+
+    @abstractmethod
+    def sleep(self, seconds: float) -> None: ...
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.time(), timezone.utc)
+
+
+class RealClock(Clock):
+    """Delegates to the ``time`` module."""
+
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(max(seconds, 0.0))
+
+
+class AcceleratedClock(Clock):
+    """Real time running ``speed`` times faster, starting at ``start``."""
+
+    def __init__(self, speed: float, start: float | None = None):
+        if speed <= 0:
+            raise ValueError("Speed must be positive.")
+        self.speed = speed
+        self._real_base = time.monotonic()
+        self._virtual_base = time.time() if start is None else start
+
+    def time(self) -> float:
+        return self._virtual_base + (time.monotonic() - self._real_base) * self.speed
+
+    def monotonic(self) -> float:
+        return self.time()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(max(seconds, 0.0) / self.speed)
+
+
+class VirtualClock(Clock):
+    """Time that only moves when something sleeps or calls ``advance``."""
+
+    def __init__(self, start: float = 0.0):
+        self._now = float(start)
+        self.sleeps = []
+
+    def time(self) -> float:
+        return self._now
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        seconds = max(seconds, 0.0)
+        self.sleeps.append(seconds)
+        self._now += seconds
+
+    def advance(self, seconds: float) -> None:
+        self._now += max(seconds, 0.0)
+
+
+REAL_CLOCK = RealClock()
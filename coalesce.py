@@ -0,0 +1,110 @@
+"""Single-flight read coalescing for broker HTTP calls."""
+
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+
+@dataclass
+class ReadStats:
+    """Per-endpoint counters for coalesced reads."""
+
+    hits: int = 0
+    misses: int = 0
+    shared: int = 0
+    invalidations: int = 0
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+def request_key(method: str, path: str, payload=None) -> tuple[str, str, str]:
+    """Build a hashable cache key for a request and its JSON body."""
+    body = "" if payload is None else json.dumps(payload, sort_keys=True)
+    return method.upper(), path, body
+
+
+class ReadCoalescer:
+    """Share identical read responses that are in flight or still fresh.
+
+    ``freshness`` maps ``(METHOD, path)`` to the number of seconds a response
+    may be reused. Endpoints that are not listed are never coalesced.
+    """
+
+    def __init__(self, freshness: dict[tuple[str, str], float], clock=time.monotonic):
+        self.freshness = dict(freshness)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._flights = {}
+        self._stats = {}
+
+    def ttl(self, method: str, path: str) -> float | None:
+        return self.freshness.get((method.upper(), path))
+
+    def _stats_for(self, key) -> ReadStats:
+        endpoint = f"{key[0]} {key[1]}"
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = ReadStats()
+        return stats
+
+    def fetch(self, key, ttl: float, loader):
+        """Return a fresh cached value for ``key`` or run ``loader`` once."""
+        with self._lock:
+            stats = self._stats_for(key)
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[0] < ttl:
+                stats.hits += 1
+                return entry[1]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                stats.misses += 1
+            else:
+                stats.shared += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = loader()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                # An invalidation during the flight detaches it; its result
+                # is still handed to waiters but never cached.
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                    if flight.error is None:
+                        self._entries[key] = (self._clock(), flight.value)
+            flight.done.set()
+        return flight.value
+
+    def invalidate(self, method: str | None = None, path: str | None = None):
+        """Drop cached entries, optionally only those for one endpoint."""
+        with self._lock:
+            for store in (self._entries, self._flights):
+                for key in list(store):
+                    if method is not None and key[0] != method.upper():
+                        continue
+                    if path is not None and key[1] != path:
+                        continue
+                    if store is self._entries:
+                        self._stats_for(key).invalidations += 1
+                    del store[key]
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {name: asdict(stats) for name, stats in self._stats.items()}
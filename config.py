@@ -17,3 +17,7 @@ SLOW = 18
 BUY_DISCOUNT_PCT = 0.0025
 LOSS_THRESHOLD_PCT = 0.008
 LOSS_CONFIRM_POLLS = 3
+SEED_STATE_PATH = os.getenv("SEED_STATE_PATH", "seed_state.json")
+METADATA_CACHE_PATH = os.getenv("METADATA_CACHE_PATH", "metadata_cache.json")
+METADATA_CACHE_TTL = 12 * 60 * 60
+EVENT_LOG_PATH = os.getenv("EVENT_LOG_PATH", "events.bin")
@@ -0,0 +1,217 @@
+"""Fixed-layout binary event log with an in-memory ring spilled to mmap.
+
+Usage::
+
+    python eventlog.py events.bin --type EXIT --symbol ITMl_EQ --tail 50
+"""
+
+import argparse
+import mmap
+import os
+import struct
+from collections import namedtuple
+from datetime import datetime, timezone
+from enum import IntEnum
+
+from clocks import REAL_CLOCK, Clock
+
+MAGIC = b"T212EVT1"
+HEADER = struct.Struct("<8sHHIQ")  # magic, version, record size, capacity, count
+RECORD = struct.Struct("<dH2x16sddf")  # ts, type, symbol, price, qty, latency ms
+VERSION = 1
+SYMBOL_BYTES = 16
+
+
+class EventType(IntEnum):
+    STARTUP = 1
+    BAR = 2
+    ENTRY = 3
+    EXIT = 4
+    FLATTEN = 5
+    RATE_LIMIT = 6
+    DATA_OUTAGE = 7
+    SESSION_END = 8
+
+
+Event = namedtuple("Event", "ts type symbol price qty latency")
+
+
+class EventLog:
+    """Record events into a memory ring and spill them to an mmap'd file.
+
+    Recording packs one ``RECORD`` into a preallocated buffer; the file copy
+    happens every ``spill_interval`` seconds or once half the ring is
+    pending, so the ring never overwrites unspilled records. Without a
+    ``path`` the log only keeps the last ``capacity`` events in memory.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        capacity: int = 4096,
+        file_capacity: int = 1 << 18,
+        spill_interval: float = 5.0,
+        clock: Clock | None = None,
+    ):
+        self.path = path
+        self.capacity = capacity
+        self.spill_interval = spill_interval
+        self._clock = clock or REAL_CLOCK
+        self._buffer = bytearray(capacity * RECORD.size)
+        self._written = 0
+        self._spilled = 0
+        self._last_spill = self._clock.monotonic()
+        self._file = None
+        self._map = None
+        self._file_count = 0
+        self.file_capacity = file_capacity
+        if path:
+            self._open(path)
+
+    def _open(self, path):
+        size = HEADER.size + self.file_capacity * RECORD.size
+        existing = os.path.exists(path) and os.path.getsize(path) >= HEADER.size
+        self._file = open(path, "r+b" if existing else "w+b")
+        try:
+            if existing:
+                magic, _, record_size, capacity, count = HEADER.unpack(
+                    self._file.read(HEADER.size)
+                )
+                if magic != MAGIC or record_size != RECORD.size:
+                    raise ValueError(f"{path} is not an event log.")
+                self.file_capacity = capacity
+                size = HEADER.size + capacity * RECORD.size
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+        except Exception:
+            self._file.close()
+            self._file = None
+            raise
+        if not existing:
+            HEADER.pack_into(
+                self._map, 0, MAGIC, VERSION, RECORD.size, self.file_capacity, 0
+            )
+        self._file_count = HEADER.unpack_from(self._map, 0)[4]
+
+    def record(self, kind, symbol="", price=0.0, qty=0.0, latency=0.0):
+        """Append one event; ``latency`` is in milliseconds."""
+        offset = (self._written % self.capacity) * RECORD.size
+        RECORD.pack_into(
+            self._buffer,
+            offset,
+            self._clock.time(),
+            kind,
+            symbol.encode()[:SYMBOL_BYTES],
+            price,
+            qty,
+            latency,
+        )
+        self._written += 1
+        if self._map is not None and (
+            self._written - self._spilled >= self.capacity // 2
+            or self._clock.monotonic() - self._last_spill >= self.spill_interval
+        ):
+            self.spill()
+
+    def recent(self) -> list[Event]:
+        """Return the events still held in the memory ring, oldest first."""
+        start = max(self._written - self.capacity, 0)
+        return [
+            _decode(self._buffer, (n % self.capacity) * RECORD.size)
+            for n in range(start, self._written)
+        ]
+
+    def spill(self):
+        """Copy records recorded since the last spill into the mapped file."""
+        self._last_spill = self._clock.monotonic()
+        if self._map is None or self._spilled == self._written:
+            return
+        for n in range(self._spilled, self._written):
+            src = (n % self.capacity) * RECORD.size
+            slot = (self._file_count % self.file_capacity) * RECORD.size
+            dst = HEADER.size + slot
+            self._map[dst : dst + RECORD.size] = self._buffer[src : src + RECORD.size]
+            self._file_count += 1
+        struct.pack_into("<Q", self._map, HEADER.size - 8, self._file_count)
+        self._spilled = self._written
+
+    def close(self):
+        if self._map is None:
+            return
+        self.spill()
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+        self._map = self._file = None
+
+
+def _decode(buffer, offset) -> Event:
+    ts, kind, symbol, price, qty, latency = RECORD.unpack_from(buffer, offset)
+    try:
+        kind = EventType(kind)
+    except ValueError:
+        pass
+    symbol = symbol.rstrip(b"\0").decode(errors="replace")
+    return Event(ts, kind, symbol, price, qty, latency)
+
+
+def read_events(path: str) -> list[Event]:
+    """Decode every event still retained in ``path``, oldest first."""
+    with open(path, "rb") as handle:
+        data = handle.read()
+    magic, _, record_size, capacity, count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or record_size != RECORD.size:
+        raise ValueError(f"{path} is not an event log.")
+    return [
+        _decode(data, HEADER.size + (n % capacity) * RECORD.size)
+        for n in range(max(count - capacity, 0), count)
+    ]
+
+
+def _parse_time(text: str) -> float:
+    try:
+        return float(text)
+    except ValueError:
+        stamp = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        if stamp.tzinfo is None:
+            stamp = stamp.replace(tzinfo=timezone.utc)
+        return stamp.timestamp()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decode a binary event log.")
+    parser.add_argument("path")
+    parser.add_argument(
+        "--type",
+        action="append",
+        choices=[kind.name for kind in EventType],
+        help="only show these event types (repeatable)",
+    )
+    parser.add_argument("--symbol")
+    parser.add_argument("--since", type=_parse_time, help="ISO time or epoch")
+    parser.add_argument("--until", type=_parse_time, help="ISO time or epoch")
+    parser.add_argument("--tail", type=int, help="show only the last N matches")
+    args = parser.parse_args(argv)
+
+    kinds = {EventType[name] for name in args.type} if args.type else None
+    rows = [
+        event
+        for event in read_events(args.path)
+        if (kinds is None or event.type in kinds)
+        and (args.symbol is None or event.symbol == args.symbol)
+        and (args.since is None or event.ts >= args.since)
+        and (args.until is None or event.ts <= args.until)
+    ]
+    if args.tail is not None:
+        rows = rows[-args.tail :] if args.tail > 0 else []
+    for event in rows:
+        stamp = datetime.fromtimestamp(event.ts, timezone.utc).isoformat()
+        kind = getattr(event.type, "name", event.type)
+        print(
+            f"{stamp} {kind:<11} {event.symbol:<12} price={event.price:.4f} "
+            f"qty={event.qty:g} latency={event.latency:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,37 +2,40 @@ import csv
 import math
 import os
 import time
-from statistics import mean
 
 from broker import Broker, MarketDataUnavailable, RateLimitError
+from clocks import Clock
 from config import (
     API_BASE_URL,
     API_KEY,
-    BUY_DISCOUNT_PCT,
-    LOSS_CONFIRM_POLLS,
+    EVENT_LOG_PATH,
     LOSS_THRESHOLD_PCT,
     NO_NEW_TRADES_MIN,
     RISK_PCT,
-    SLOW,
     SYMBOL,
     TIMEFRAME,
-    TP_R_MULT,
     WARMUP_SECONDS,
 )
+from eventlog import EventLog, EventType
+from strategy import entry_signal, exit_signal, trade_levels
 
 POSITION_EPS = 1e-6
-WINDOW = max(SLOW, 20)
 
 
-def sleep_for_rate_limit(err: RateLimitError, context: str):
+def sleep_for_rate_limit(
+    err: RateLimitError, context: str, clock: Clock, events: EventLog | None = None
+):
     wait_seconds = max(int((err.retry_after or 30)), 5)
+    if events is not None:
+        events.record(EventType.RATE_LIMIT, SYMBOL, latency=wait_seconds * 1000.0)
     print(
         f"Rate limit while {context}; sleeping {wait_seconds}s before retrying."
     )
-    time.sleep(wait_seconds)
+    clock.sleep(wait_seconds)
 
 
 def wait_for_open(bkr: Broker):
+    clock = bkr.time_source
     while True:
         clk = bkr.clock()
         if clk.get("is_open"):
@@ -41,18 +44,16 @@ def wait_for_open(bkr: Broker):
         seconds_to_open = int(clk.get("seconds_to_open", 0))
         sleep_for = max(seconds_to_open, 15)
         print(f"Market closed, waiting {sleep_for}s until open")
-        time.sleep(sleep_for)
-    time.sleep(WARMUP_SECONDS)
+        clock.sleep(sleep_for)
+    clock.sleep(WARMUP_SECONDS)
+    opened = bkr.prewarm()
+    print(f"Pre-warmed {opened} API connection(s)")
 
 
 def minutes_to_close(bkr: Broker) -> int:
     return int(bkr.clock().get("minutes_to_close", 0))
 
 
-def sma(vals, n):
-    return mean(vals[-n:])
-
-
 def log_trade(row: dict):
     path = "trades_log.csv"
     file_exists = os.path.exists(path)
@@ -65,15 +66,43 @@ def log_trade(row: dict):
         writer.writerow(row)
 
 
-def run():
-    bkr = Broker()
+def report_startup(bkr: Broker):
+    timings = dict(bkr.startup_timings)
+    total = timings.pop("total", 0.0)
+    parts = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in timings.items())
+    print(f"Broker ready in {total:.2f}s ({parts})")
+
+
+def run(bkr: Broker | None = None, events: EventLog | None = None):
+    bkr = bkr or Broker(fast_start=True)
+    clock = bkr.time_source
+    if events is None:
+        try:
+            events = EventLog(EVENT_LOG_PATH, clock=clock)
+        except (OSError, ValueError) as exc:
+            # The log is for post-mortems only; trade without the file copy.
+            print(
+                f"Event log {EVENT_LOG_PATH} unavailable ({exc}); "
+                "keeping events in memory"
+            )
+            events = EventLog(None, clock=clock)
     bars = []
     last_ts = None
     trade = None
+    keep_seed = False
     try:
         print(
             f"Starting bot for {SYMBOL} ({TIMEFRAME}) using API key present={bool(API_KEY)}"
         )
+        report_startup(bkr)
+        events.record(
+            EventType.STARTUP,
+            SYMBOL,
+            latency=bkr.startup_timings.get("total", 0.0) * 1000.0,
+        )
+        # Records only spill from record(); do not leave STARTUP in memory
+        # through what can be hours of waiting for the open.
+        events.spill()
         wait_for_open(bkr)
         print("Warmup complete, entering trading loop")
         while True:
@@ -81,28 +110,38 @@ def run():
             try:
                 current_qty = bkr.position(SYMBOL)
             except RateLimitError as exc:
-                sleep_for_rate_limit(exc, "checking open position")
+                sleep_for_rate_limit(exc, "checking open position", clock, events)
                 continue
             if trade and abs(current_qty) <= POSITION_EPS:
                 trade = None
             if not trade and minutes_left <= NO_NEW_TRADES_MIN:
                 print("Market closing soon, stopping for the day.")
+                events.record(EventType.SESSION_END, SYMBOL)
                 break
+            started = time.perf_counter()
             try:
                 bar = bkr.get_latest_bar(SYMBOL, TIMEFRAME)
             except RateLimitError as exc:
-                sleep_for_rate_limit(exc, "fetching latest bar")
+                sleep_for_rate_limit(exc, "fetching latest bar", clock, events)
                 continue
             except MarketDataUnavailable as exc:
                 print(f"Market data unavailable: {exc}")
-                time.sleep(60)
+                events.record(EventType.DATA_OUTAGE, SYMBOL)
+                clock.sleep(60)
                 continue
             ts = bar.get("ts")
             if ts == last_ts:
-                time.sleep(5)
+                clock.sleep(5)
                 continue
             last_ts = ts
             price = float(bar["close"])
+            events.record(
+                EventType.BAR,
+                SYMBOL,
+                price,
+                current_qty,
+                (time.perf_counter() - started) * 1000.0,
+            )
             parsed_bar = {
                 "ts": ts,
                 "open": float(bar["open"]),
@@ -116,7 +155,7 @@ def run():
                 bars = bars[-500:]
 
             if not trade and abs(current_qty) > POSITION_EPS:
-                time.sleep(60)
+                clock.sleep(60)
                 continue
 
             if trade:
@@ -124,23 +163,17 @@ def run():
                 if minutes_left <= NO_NEW_TRADES_MIN:
                     reason = "session_close"
                 else:
-                    if price <= trade["stop"]:
-                        trade["loss_polls"] += 1
-                    else:
-                        trade["loss_polls"] = 0
-                    if price >= trade["target"]:
-                        reason = "take_profit"
-                    elif trade["loss_polls"] >= LOSS_CONFIRM_POLLS:
-                        reason = "soft_stop"
+                    reason = exit_signal(trade, price)
                 if reason:
                     exit_qty = trade["qty"]
                     try:
                         exit_order = bkr.place_order(SYMBOL, "sell", exit_qty)
                     except RateLimitError as exc:
-                        sleep_for_rate_limit(exc, "closing position")
+                        sleep_for_rate_limit(exc, "closing position", clock, events)
                         continue
                     order_note = exit_order.get("market", {}).get("id") or reason
                     print(f"{ts} | Exit {reason} qty={exit_qty} price={price:.2f}")
+                    events.record(EventType.EXIT, SYMBOL, price, -exit_qty)
                     log_trade(
                         {
                             "ts": ts,
@@ -153,45 +186,39 @@ def run():
                         }
                     )
                     trade = None
-                    time.sleep(60)
+                    clock.sleep(60)
                     continue
-                time.sleep(60)
+                clock.sleep(60)
                 continue
 
             if minutes_left <= NO_NEW_TRADES_MIN:
-                time.sleep(60)
-                continue
-
-            if len(bars) < WINDOW:
-                time.sleep(60)
+                clock.sleep(60)
                 continue
 
-            avg_price = sma([b["close"] for b in bars], WINDOW)
-            if price > avg_price * (1 - BUY_DISCOUNT_PCT):
-                time.sleep(60)
+            if not entry_signal([b["close"] for b in bars]):
+                clock.sleep(60)
                 continue
 
             risk_per_share = price * LOSS_THRESHOLD_PCT
             if risk_per_share <= 0:
-                time.sleep(60)
+                clock.sleep(60)
                 continue
 
             try:
                 equity = bkr.get_equity()
             except RateLimitError as exc:
-                sleep_for_rate_limit(exc, "fetching account equity")
+                sleep_for_rate_limit(exc, "fetching account equity", clock, events)
                 continue
             qty = math.floor((equity * RISK_PCT) / risk_per_share)
             if qty <= 0:
-                time.sleep(60)
+                clock.sleep(60)
                 continue
 
-            target = price * (1 + LOSS_THRESHOLD_PCT * TP_R_MULT)
-            stop = price * (1 - LOSS_THRESHOLD_PCT)
+            stop, target = trade_levels(price)
             try:
                 order_result = bkr.place_order(SYMBOL, "buy", qty)
             except RateLimitError as exc:
-                sleep_for_rate_limit(exc, "placing entry order")
+                sleep_for_rate_limit(exc, "placing entry order", clock, events)
                 continue
             market_order = order_result.get("market", {})
             order_note = market_order.get("id") or market_order.get("status", "")
@@ -199,6 +226,7 @@ def run():
                 f"{ts} | Enter buy qty={qty} price={price:.2f} "
                 f"target={target:.2f} stop={stop:.2f}"
             )
+            events.record(EventType.ENTRY, SYMBOL, price, qty)
             log_trade(
                 {
                     "ts": ts,
@@ -217,13 +245,19 @@ def run():
                 "target": target,
                 "loss_polls": 0,
             }
-            time.sleep(60)
+            clock.sleep(60)
+    except Exception:
+        # A supervisor restart reuses the seed recorded in the state file.
+        keep_seed = True
+        raise
     finally:
         try:
             try:
                 remaining = bkr.position(SYMBOL)
             except RateLimitError as exc:
-                sleep_for_rate_limit(exc, "checking position during shutdown")
+                sleep_for_rate_limit(
+                    exc, "checking position during shutdown", clock, events
+                )
                 try:
                     remaining = bkr.position(SYMBOL)
                 except RateLimitError:
@@ -240,9 +274,16 @@ def run():
                 while attempts < 3:
                     try:
                         order_response = bkr.place_order(SYMBOL, side, abs_qty)
+                        events.record(
+                            EventType.FLATTEN,
+                            SYMBOL,
+                            qty=-abs_qty if side == "sell" else abs_qty,
+                        )
                         log_trade(
                             {
-                                "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                                "ts": clock.now().strftime(
+                                    "%Y-%m-%dT%H:%M:%S"
+                                ),
                                 "price": 0,
                                 "signal": "flatten",
                                 "qty": -abs_qty if side == "sell" else abs_qty,
@@ -257,7 +298,7 @@ def run():
                     except RateLimitError as exc:
                         attempts += 1
                         sleep_for_rate_limit(
-                            exc, "flattening position during shutdown"
+                            exc, "flattening position during shutdown", clock, events
                         )
                 else:
                     print(
@@ -265,7 +306,12 @@ def run():
                         "Please close the position manually."
                     )
         finally:
-            bkr.close()
+            try:
+                events.close()
+            except Exception as exc:
+                # Never replace the loop's own error with a logging failure.
+                print(f"Could not close event log: {exc}")
+            bkr.close(drop_seed=not keep_seed)
 
 
 if __name__ == "__main__":
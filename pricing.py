@@ -0,0 +1,167 @@
+"""Last-known price cache and background seed placement for price discovery."""
+
+import json
+import os
+import threading
+import time
+
+from clocks import REAL_CLOCK, Clock
+
+PRICE_MAX_AGE = 300.0
+# Upper bound on waiting for a background seed at shutdown; covers the full
+# seed backoff schedule in broker.py plus request time.
+SEED_JOIN_TIMEOUT = 60.0
+
+
+class PriceDiscovery:
+    """Track the latest price seen per ticker and seed positions off the loop.
+
+    ``seed`` is called with a ticker on a background thread and must return a
+    position snapshot containing ``currentPrice``. Seed flags and prices are
+    persisted to ``state_path`` (when set) so a restarted process can reuse
+    the seed and serve cached prices immediately.
+    """
+
+    def __init__(
+        self,
+        seed,
+        clock: Clock | None = None,
+        state_path: str | None = None,
+        max_age: float = PRICE_MAX_AGE,
+    ):
+        self._seed = seed
+        self._clock = clock or REAL_CLOCK
+        self.state_path = state_path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._prices = {}
+        self._seen = set()
+        self._seeded = set()
+        self._threads = {}
+        self._errors = {}
+        self.closed = False
+        self._load()
+
+    def record(self, ticker: str, price: float, stamp: float | None = None):
+        stamp = self._clock.time() if stamp is None else stamp
+        with self._lock:
+            self._prices[ticker] = (price, stamp)
+            self._seen.add(ticker)
+
+    def last_known(self, ticker: str) -> tuple[float, float] | None:
+        """Return ``(price, stamp)`` if a price no older than ``max_age`` exists."""
+        with self._lock:
+            entry = self._prices.get(ticker)
+        if entry is None or self._clock.time() - entry[1] > self.max_age:
+            return None
+        return entry
+
+    def known(self, ticker: str) -> bool:
+        """True if ``ticker`` was priced by this process or has a fresh price.
+
+        A stale price loaded from ``state_path`` does not count, so the first
+        lookup after a restart still discovers the price directly.
+        """
+        with self._lock:
+            if ticker in self._seen:
+                return True
+        return self.last_known(ticker) is not None
+
+    def seeded(self, ticker: str) -> bool:
+        with self._lock:
+            return ticker in self._seeded
+
+    def mark_seeded(self, ticker: str, active: bool):
+        with self._lock:
+            if active == (ticker in self._seeded):
+                return
+            if active:
+                self._seeded.add(ticker)
+            else:
+                self._seeded.discard(ticker)
+        self.save()
+
+    def start_seed(self, ticker: str) -> bool:
+        """Seed ``ticker`` on a background thread.
+
+        Returns False if a seed is already running or the service is closed.
+        """
+        with self._lock:
+            if self.closed:
+                return False
+            running = self._threads.get(ticker)
+            if running is not None and running.is_alive():
+                return False
+            thread = threading.Thread(
+                target=self._run_seed, args=(ticker,), daemon=True
+            )
+            self._threads[ticker] = thread
+        thread.start()
+        return True
+
+    def wait(self, ticker: str, timeout: float | None = None) -> bool:
+        """Block until any background seed for ``ticker`` finishes."""
+        with self._lock:
+            thread = self._threads.get(ticker)
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def pop_error(self, ticker: str) -> Exception | None:
+        """Return and clear the failure of the last background seed, if any."""
+        with self._lock:
+            return self._errors.pop(ticker, None)
+
+    def close(self, timeout: float = SEED_JOIN_TIMEOUT) -> bool:
+        """Refuse new seeds and wait for running ones; False on timeout."""
+        with self._lock:
+            self.closed = True
+            threads = list(self._threads.values())
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            thread.join(max(deadline - time.monotonic(), 0.0))
+        return not any(thread.is_alive() for thread in threads)
+
+    def _run_seed(self, ticker: str):
+        try:
+            data = self._seed(ticker)
+        except Exception as exc:
+            with self._lock:
+                self._errors[ticker] = exc
+            return
+        self.record(ticker, float(data.get("currentPrice")))
+
+    def _load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path) as handle:
+                state = json.load(handle)
+        except (OSError, ValueError):
+            return
+        for ticker, row in state.get("tickers", {}).items():
+            if row.get("seeded"):
+                self._seeded.add(ticker)
+            if row.get("price") is not None and row.get("ts") is not None:
+                self._prices[ticker] = (float(row["price"]), float(row["ts"]))
+
+    def save(self):
+        if not self.state_path:
+            return
+        with self._lock:
+            tickers = {
+                ticker: {"seeded": ticker in self._seeded}
+                for ticker in self._seeded | set(self._prices)
+            }
+            for ticker, (price, stamp) in self._prices.items():
+                tickers[ticker].update(price=price, ts=stamp)
+        tmp_path = f"{self.state_path}.tmp"
+        try:
+            with open(tmp_path, "w") as handle:
+                json.dump({"tickers": tickers}, handle)
+            os.replace(tmp_path, self.state_path)
+        except OSError as exc:
+            # Losing the state only costs a restart its fast path; an error
+            # here must not abort a seed whose order is already placed.
+            print(f"Could not write seed state {self.state_path}: {exc}")
@@ -0,0 +1,131 @@
+"""NumPy batch versions of the strategy rules for backtests and scans.
+
+Results match the bar-by-bar rules in ``strategy`` exactly. Bars whose close
+lands within rounding distance of the SMA discount threshold are re-checked
+with ``strategy.entry_signal`` so float summation order never flips a signal.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config import BUY_DISCOUNT_PCT, LOSS_CONFIRM_POLLS, LOSS_THRESHOLD_PCT, TP_R_MULT
+from strategy import WINDOW, entry_signal, trade_levels
+
+_TIE_RTOL = 1e-9
+_EXIT_CHUNK = 256
+
+
+def entry_mask(closes, window=WINDOW, discount=BUY_DISCOUNT_PCT) -> np.ndarray:
+    """Return a boolean mask of bars where a flat book would enter.
+
+    ``closes`` may be one series or a 2-D array with one instrument per row;
+    the SMA always runs along the last axis.
+    """
+    values = np.asarray(closes, dtype=float)
+    mask = np.zeros(values.shape, dtype=bool)
+    if values.shape[-1] < window:
+        return mask
+    means = sliding_window_view(values, window, axis=-1).mean(axis=-1)
+    thresholds = means * (1 - discount)
+    prices = values[..., window - 1 :]
+    mask[..., window - 1 :] = ~(prices > thresholds)
+    near = np.abs(prices - thresholds) <= _TIE_RTOL * np.abs(thresholds)
+    for *row, start in zip(*np.nonzero(near)):
+        history = values[tuple(row)][start : start + window]
+        mask[tuple(row) + (start + window - 1,)] = entry_signal(
+            history.tolist(), window, discount
+        )
+    return mask
+
+
+def confirmation_runs(hits) -> np.ndarray:
+    """Length of the run of consecutive True values ending at each index."""
+    hits = np.asarray(hits, dtype=bool)
+    idx = np.arange(hits.size)
+    last_miss = np.maximum.accumulate(np.where(hits, -1, idx))
+    return idx - last_miss
+
+
+def first_exit(
+    closes,
+    entry: int,
+    loss_pct=LOSS_THRESHOLD_PCT,
+    tp_mult=TP_R_MULT,
+    confirm_polls=LOSS_CONFIRM_POLLS,
+) -> tuple[int | None, str | None]:
+    """Return ``(index, reason)`` of the exit for a long entered at ``entry``.
+
+    Bars after the entry are scanned in growing chunks, so a quick exit never
+    pays for the rest of the history. ``(None, None)`` means still open.
+    """
+    values = np.asarray(closes, dtype=float)
+    stop, target = trade_levels(float(values[entry]), loss_pct, tp_mult)
+    start = entry + 1
+    chunk = _EXIT_CHUNK
+    carry = 0
+    while start < values.size:
+        segment = values[start : start + chunk]
+        take_profit = segment >= target
+        runs = confirmation_runs(segment <= stop)
+        runs += np.where(runs == np.arange(1, segment.size + 1), carry, 0)
+        hit = take_profit | (runs >= confirm_polls)
+        if hit.any():
+            offset = int(np.argmax(hit))
+            reason = "take_profit" if take_profit[offset] else "soft_stop"
+            return start + offset, reason
+        carry = int(runs[-1])
+        start += segment.size
+        chunk *= 2
+    return None, None
+
+
+def simulate(
+    closes,
+    window=WINDOW,
+    discount=BUY_DISCOUNT_PCT,
+    loss_pct=LOSS_THRESHOLD_PCT,
+    tp_mult=TP_R_MULT,
+    confirm_polls=LOSS_CONFIRM_POLLS,
+) -> list[tuple[int, int | None, str | None]]:
+    """Return ``(entry, exit, reason)`` for each trade the live loop would take.
+
+    Session-close exits, position sizing and broker failures are out of scope;
+    the open trade at the end of the history has ``exit`` and ``reason`` None.
+    """
+    values = np.asarray(closes, dtype=float)
+    mask = entry_mask(values, window, discount)
+    return trades_from_mask(
+        values, mask, loss_pct=loss_pct, tp_mult=tp_mult, confirm_polls=confirm_polls
+    )
+
+
+def trades_from_mask(
+    closes,
+    mask,
+    start: int = 0,
+    stop: int | None = None,
+    loss_pct=LOSS_THRESHOLD_PCT,
+    tp_mult=TP_R_MULT,
+    confirm_polls=LOSS_CONFIRM_POLLS,
+) -> list[tuple[int, int | None, str | None]]:
+    """Like ``simulate`` for bars ``[start, stop)`` using a precomputed mask.
+
+    The mask is computed over the full history, so the SMA at ``start``
+    already carries the bars before it, as the live loop's buffer would.
+    """
+    values = np.asarray(closes, dtype=float)
+    stop = values.size if stop is None else stop
+    bounded = values[:stop]
+    entries = np.flatnonzero(mask[start:stop]) + start
+    trades = []
+    cursor = start
+    while True:
+        k = int(np.searchsorted(entries, cursor))
+        if k >= entries.size:
+            return trades
+        entry = int(entries[k])
+        exit_idx, reason = first_exit(bounded, entry, loss_pct, tp_mult, confirm_polls)
+        trades.append((entry, exit_idx, reason))
+        if exit_idx is None:
+            return trades
+        cursor = exit_idx + 1
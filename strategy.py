@@ -0,0 +1,50 @@
+"""Bar-by-bar entry and exit rules shared by the live loop and backtests."""
+
+from statistics import mean
+
+from config import (
+    BUY_DISCOUNT_PCT,
+    LOSS_CONFIRM_POLLS,
+    LOSS_THRESHOLD_PCT,
+    SLOW,
+    TP_R_MULT,
+)
+
+
+def window_for(slow: int) -> int:
+    """SMA length used for a given ``SLOW`` setting."""
+    return max(slow, 20)
+
+
+WINDOW = window_for(SLOW)
+
+
+def sma(vals, n):
+    return mean(vals[-n:])
+
+
+def entry_signal(closes, window=WINDOW, discount=BUY_DISCOUNT_PCT) -> bool:
+    """Return True when the latest close sits at least ``discount`` below the SMA."""
+    if len(closes) < window:
+        return False
+    return not closes[-1] > sma(closes, window) * (1 - discount)
+
+
+def trade_levels(
+    price, loss_pct=LOSS_THRESHOLD_PCT, tp_mult=TP_R_MULT
+) -> tuple[float, float]:
+    """Return ``(stop, target)`` for a long entry at ``price``."""
+    return price * (1 - loss_pct), price * (1 + loss_pct * tp_mult)
+
+
+def exit_signal(trade: dict, price, confirm_polls=LOSS_CONFIRM_POLLS) -> str | None:
+    """Update ``trade["loss_polls"]`` for ``price`` and return an exit reason."""
+    if price <= trade["stop"]:
+        trade["loss_polls"] += 1
+    else:
+        trade["loss_polls"] = 0
+    if price >= trade["target"]:
+        return "take_profit"
+    if trade["loss_polls"] >= confirm_polls:
+        return "soft_stop"
+    return None
@@ -1,7 +1,20 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # Ensure project root is on sys.path so tests can import local modules.
 SYS_ROOT = Path(__file__).resolve().parents[1]
 if str(SYS_ROOT) not in sys.path:
     sys.path.insert(0, str(SYS_ROOT))
+
+
+@pytest.fixture(autouse=True)
+def isolated_state_files(tmp_path, monkeypatch):
+    """Keep persisted seed, price and metadata state out of the working tree."""
+    import broker
+
+    monkeypatch.setattr(broker, "SEED_STATE_PATH", str(tmp_path / "seed_state.json"))
+    monkeypatch.setattr(
+        broker, "METADATA_CACHE_PATH", str(tmp_path / "metadata_cache.json")
+    )
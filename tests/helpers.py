@@ -0,0 +1,58 @@
+"""Fakes and reference implementations shared by the test modules."""
+
+import json
+
+import numpy as np
+import requests
+
+from config import BUY_DISCOUNT_PCT, LOSS_THRESHOLD_PCT
+from strategy import WINDOW, entry_signal, exit_signal, trade_levels
+
+
+def fake_response(status=200, body=b"{}", headers=None):
+    """Build a ``requests.Response``; non-bytes bodies are encoded as JSON."""
+    response = requests.Response()
+    response.status_code = status
+    response._content = body if isinstance(body, bytes) else json.dumps(body).encode()
+    response.headers.update(headers or {})
+    return response
+
+
+def random_walk(seed, size=600):
+    """Deterministic geometric random walk of closes starting near 100."""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0.0, 0.004, size)
+    return (100.0 * np.exp(np.cumsum(steps))).tolist()
+
+
+def loop_trades(
+    closes,
+    window=WINDOW,
+    discount=BUY_DISCOUNT_PCT,
+    loss_pct=LOSS_THRESHOLD_PCT,
+    start=0,
+    stop=None,
+):
+    """Replay the live loop's entry/exit decisions one bar at a time.
+
+    The replay starts flat at ``start`` with the earlier bars already in the
+    buffer, and a trade still open at ``stop`` is left without an exit.
+    """
+    stop = len(closes) if stop is None else stop
+    bars = list(closes[:start])
+    trade = None
+    trades = []
+    for i in range(start, stop):
+        price = closes[i]
+        bars.append(price)
+        if trade:
+            reason = exit_signal(trade, price)
+            if reason:
+                trades[-1] = (trades[-1][0], i, reason)
+                trade = None
+            continue
+        if entry_signal(bars, window, discount):
+            stop_price, target = trade_levels(price, loss_pct)
+            trade = {"stop": stop_price, "target": target, "loss_polls": 0}
+            trades.append((i, None, None))
+    return trades
@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from broker import Broker
+from coalesce import ReadCoalescer, request_key
+from helpers import fake_response
+
+
+def _broker(monkeypatch, handler):
+    monkeypatch.setattr(Broker, "_load_metadata", lambda self: None)
+    bkr = Broker()
+    calls = []
+
+    def fake_request(method, url, json=None, timeout=None):
+        calls.append((method, url.removeprefix(bkr.base_url), json))
+        return handler(method, url, json)
+
+    monkeypatch.setattr(bkr.session, "request", fake_request)
+    return bkr, calls
+
+
+def test_position_and_bar_share_one_snapshot(monkeypatch):
+    """Reads of the same ticker within the freshness window hit the API once."""
+    body = b'{"quantity": 0.1, "currentPrice": 50.0}'
+    bkr, calls = _broker(monkeypatch, lambda *args: fake_response(200, body))
+
+    assert bkr.position("ITMl_EQ") == 0.0
+    assert bkr.get_latest_bar("ITMl_EQ")["close"] == 50.0
+    assert bkr.position("ITMl_EQ") == 0.0
+
+    assert len(calls) == 1
+    stats = bkr.read_stats()["POST /equity/portfolio/ticker"]
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+
+def test_orders_invalidate_cached_reads(monkeypatch):
+    """Placing an order forces the next position read back to the API."""
+    bkr, calls = _broker(
+        monkeypatch, lambda *args: fake_response(200, b'{"quantity": 2.0}')
+    )
+
+    bkr.position("ITMl_EQ")
+    bkr.place_order("ITMl_EQ", "buy", 1)
+    bkr.position("ITMl_EQ")
+
+    paths = [path for _, path, _ in calls]
+    assert paths == [
+        "/equity/portfolio/ticker",
+        "/equity/orders/market",
+        "/equity/portfolio/ticker",
+    ]
+
+
+def test_failed_order_still_invalidates_reads(monkeypatch):
+    """An order that errors after reaching the server drops cached reads."""
+
+    def handler(method, url, json):
+        if url.endswith("/equity/orders/market"):
+            raise requests.ReadTimeout("order response lost")
+        return fake_response(200, b'{"quantity": 2.0}')
+
+    bkr, calls = _broker(monkeypatch, handler)
+
+    bkr.position("ITMl_EQ")
+    with pytest.raises(requests.ReadTimeout):
+        bkr.place_order("ITMl_EQ", "buy", 1)
+    bkr.position("ITMl_EQ")
+
+    paths = [path for _, path, _ in calls]
+    assert paths.count("/equity/portfolio/ticker") == 2
+
+
+def test_coalescer_expires_entries():
+    """Entries older than the endpoint freshness are reloaded."""
+    now = [0.0]
+    reads = ReadCoalescer({("GET", "/cash"): 2.0}, clock=lambda: now[0])
+    key = request_key("GET", "/cash")
+    loads = []
+
+    def loader():
+        loads.append(now[0])
+        return len(loads)
+
+    assert reads.fetch(key, 2.0, loader) == 1
+    now[0] = 1.9
+    assert reads.fetch(key, 2.0, loader) == 1
+    now[0] = 2.5
+    assert reads.fetch(key, 2.0, loader) == 2
+    assert reads.stats()["GET /cash"] == {
+        "hits": 1,
+        "misses": 2,
+        "shared": 0,
+        "invalidations": 0,
+    }
+
+
+def test_coalescer_single_flight():
+    """Concurrent callers wait on the in-flight load instead of repeating it."""
+    reads = ReadCoalescer({("GET", "/cash"): 0.0})
+    key = request_key("GET", "/cash")
+    started = threading.Event()
+    release = threading.Event()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return "cash"
+
+    results = []
+    leader = threading.Thread(
+        target=lambda: results.append(reads.fetch(key, 0.0, loader))
+    )
+    leader.start()
+    started.wait(timeout=5)
+    follower = threading.Thread(
+        target=lambda: results.append(reads.fetch(key, 0.0, loader))
+    )
+    follower.start()
+    deadline = time.monotonic() + 5
+    while reads.stats()["GET /cash"]["shared"] == 0:
+        if time.monotonic() > deadline:
+            release.set()
+            pytest.fail("follower never joined the in-flight load")
+        time.sleep(0.001)
+    release.set()
+    leader.join(timeout=5)
+    follower.join(timeout=5)
+
+    assert results == ["cash", "cash"]
+    assert len(loads) == 1
@@ -1,4 +1,3 @@
-import broker
 import pytest
 from broker import (
     Broker,
@@ -6,12 +5,14 @@ from broker import (
     SEED_INITIAL_DELAY,
     SEED_QTY,
 )
+from clocks import VirtualClock
 
 
 def test_ensure_seed_handles_delayed_position(monkeypatch):
     """Broker waits for the seed position long enough before failing."""
     monkeypatch.setattr(Broker, "_load_metadata", lambda self: None)
-    bkr = Broker()
+    clock = VirtualClock()
+    bkr = Broker(clock=clock)
 
     order_calls = []
 
@@ -28,28 +29,23 @@ def test_ensure_seed_handles_delayed_position(monkeypatch):
             return responses.pop(0)
         return {"quantity": SEED_QTY, "currentPrice": "100.00"}
 
-    sleeps = []
-
-    def fake_sleep(seconds):
-        sleeps.append(seconds)
-
     monkeypatch.setattr(bkr, "_market_order", fake_order)
     monkeypatch.setattr(bkr, "_position_raw", fake_position)
-    monkeypatch.setattr(broker.time, "sleep", fake_sleep)
 
     data = bkr._ensure_seed("ITMl_EQ")
 
     assert data["currentPrice"] == "100.00"
     assert order_calls == [("ITMl_EQ", SEED_QTY)]
     assert len(position_calls) == 6  # 5 misses + 1 success
-    assert sleeps and sleeps[0] >= SEED_INITIAL_DELAY
+    assert clock.sleeps and clock.sleeps[0] >= SEED_INITIAL_DELAY
     assert bkr.seed_active is True
 
 
 def test_ensure_seed_raises_when_no_data(monkeypatch):
     """Ensure seed attempts raise when no position snapshot ever arrives."""
     monkeypatch.setattr(Broker, "_load_metadata", lambda self: None)
-    bkr = Broker()
+    clock = VirtualClock()
+    bkr = Broker(clock=clock)
 
     order_calls = []
 
@@ -59,7 +55,6 @@ def test_ensure_seed_raises_when_no_data(monkeypatch):
 
     monkeypatch.setattr(bkr, "_market_order", fake_order)
     monkeypatch.setattr(bkr, "_position_raw", lambda symbol: None)
-    monkeypatch.setattr(broker.time, "sleep", lambda seconds: None)
 
     with pytest.raises(MarketDataUnavailable):
         bkr._ensure_seed("ITMl_EQ")
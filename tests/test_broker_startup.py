@@ -0,0 +1,98 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+import broker
+from broker import Broker
+from config import SYMBOL
+from helpers import fake_response
+
+
+class FakeMetadataApi:
+    """Serves metadata and snapshots; metadata calls must overlap in time."""
+
+    def __init__(self):
+        self.paths = []
+        self.overlap = threading.Barrier(2, timeout=2)
+        close_at = datetime.now(timezone.utc) + timedelta(hours=3)
+        self.events = [
+            {"date": "2026-01-05T14:30:00Z", "type": "OPEN"},
+            {"date": close_at.isoformat().replace("+00:00", "Z"), "type": "CLOSE"},
+        ]
+
+    def request(self, method, url, json=None, timeout=None):
+        path = url.split("/api/v0", 1)[-1]
+        self.paths.append(path)
+        if path == "/equity/metadata/instruments":
+            self.overlap.wait()
+            return fake_response(200, [{"ticker": SYMBOL, "workingScheduleId": 3}])
+        if path == "/equity/metadata/exchanges":
+            self.overlap.wait()
+            return fake_response(
+                200, [{"workingSchedules": [{"id": 3, "timeEvents": self.events}]}]
+            )
+        if path == "/equity/account/cash":
+            return fake_response(200, {"total": 5000.0})
+        return fake_response(200, {"quantity": 1.0, "currentPrice": 42.0})
+
+
+def _patch_session(monkeypatch, api):
+    monkeypatch.setattr(
+        requests.Session, "request", lambda _, *args, **kw: api.request(*args, **kw)
+    )
+
+
+def test_cold_start_fetches_metadata_concurrently(monkeypatch):
+    """Instruments and exchanges are requested side by side on a cold cache."""
+    api = FakeMetadataApi()
+    _patch_session(monkeypatch, api)
+
+    bkr = Broker()
+
+    assert len(bkr.events) == 2
+    assert sorted(api.paths) == [
+        "/equity/metadata/exchanges",
+        "/equity/metadata/instruments",
+    ]
+    assert {"session", "metadata", "total"} <= set(bkr.startup_timings)
+
+
+def test_warm_start_skips_metadata_requests(monkeypatch):
+    """A cached schedule avoids downloading metadata again."""
+    api = FakeMetadataApi()
+    _patch_session(monkeypatch, api)
+    first = Broker()
+    api.paths.clear()
+
+    second = Broker()
+
+    assert second.events == first.events
+    assert api.paths == []
+    assert second.startup_timings["total"] < 1.0
+
+
+def test_unwritable_metadata_cache_does_not_block_startup(monkeypatch, tmp_path):
+    """A cache that cannot be saved leaves the fetched schedule in place."""
+    api = FakeMetadataApi()
+    _patch_session(monkeypatch, api)
+    path = tmp_path / "missing" / "metadata_cache.json"
+    monkeypatch.setattr(broker, "METADATA_CACHE_PATH", str(path))
+
+    bkr = Broker()
+
+    assert len(bkr.events) == 2
+    assert not path.exists()
+
+
+def test_fast_start_records_last_known_price(monkeypatch):
+    """fast_start records the price without spending a cash read."""
+    api = FakeMetadataApi()
+    _patch_session(monkeypatch, api)
+
+    bkr = Broker(fast_start=True)
+
+    assert "/equity/account/cash" not in api.paths
+    assert api.paths.count("/equity/portfolio/ticker") == 1
+    assert bkr.prices.last_known(SYMBOL)[0] == 42.0
+    assert "snapshot" in bkr.startup_timings
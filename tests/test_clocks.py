@@ -0,0 +1,47 @@
+import time
+
+import pytest
+
+import clocks
+from clocks import AcceleratedClock, Clock
+
+
+def test_clock_requires_every_time_source():
+    """A clock that forgets to implement sleep cannot be built."""
+
+    class Partial(Clock):
+        def time(self):
+            return 0.0
+
+        def monotonic(self):
+            return 0.0
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_accelerated_clock_runs_speed_times_faster():
+    """Virtual time advances ``speed`` seconds per real second from ``start``."""
+    clock = AcceleratedClock(100.0, start=1_000.0)
+    assert clock.time() == pytest.approx(1_000.0, abs=1.0)
+
+    real_start = time.monotonic()
+    before = clock.time()
+    time.sleep(0.05)
+    after = clock.time()
+    real_elapsed = time.monotonic() - real_start
+
+    assert 5.0 <= after - before <= real_elapsed * 100.0
+    assert clock.monotonic() >= after
+
+
+def test_accelerated_clock_sleep_divides_by_speed(monkeypatch):
+    """Sleeping a virtual minute costs a sixtieth of a real second at 3600x."""
+    slept = []
+    monkeypatch.setattr(clocks.time, "sleep", slept.append)
+    clock = AcceleratedClock(3600.0)
+
+    clock.sleep(60.0)
+    clock.sleep(-5.0)
+
+    assert slept == [pytest.approx(60.0 / 3600.0), 0.0]
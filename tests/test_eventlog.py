@@ -0,0 +1,89 @@
+import pytest
+
+import eventlog
+from clocks import VirtualClock
+from eventlog import EventLog, EventType, read_events
+
+
+def test_spilled_events_round_trip(tmp_path):
+    """Events written to the ring decode from the mapped file in order."""
+    path = tmp_path / "events.bin"
+    clock = VirtualClock(1_700_000_000.0)
+    log = EventLog(str(path), capacity=8, file_capacity=64, clock=clock)
+    log.record(EventType.BAR, "ITMl_EQ", 101.5, 0.0, 12.5)
+    clock.advance(60)
+    log.record(EventType.ENTRY, "ITMl_EQ", 101.25, 7.0)
+    log.close()
+
+    events = read_events(str(path))
+
+    assert [(e.type, e.symbol, e.price, e.qty) for e in events] == [
+        (EventType.BAR, "ITMl_EQ", 101.5, 0.0),
+        (EventType.ENTRY, "ITMl_EQ", 101.25, 7.0),
+    ]
+    assert events[0].latency == 12.5
+    assert events[1].ts - events[0].ts == 60.0
+
+
+def test_ring_spills_before_overwriting(tmp_path):
+    """A small memory ring never loses records and the file keeps the newest."""
+    path = tmp_path / "events.bin"
+    log = EventLog(str(path), capacity=4, file_capacity=10, spill_interval=1e9)
+    for n in range(25):
+        log.record(EventType.BAR, "ITMl_EQ", float(n))
+    assert [e.price for e in log.recent()] == [21.0, 22.0, 23.0, 24.0]
+    log.close()
+
+    retained = [e.price for e in read_events(str(path))]
+    assert retained == [float(n) for n in range(15, 25)]
+
+
+def test_reopen_appends_after_existing_records(tmp_path):
+    """A restarted process continues the same file instead of truncating it."""
+    path = str(tmp_path / "events.bin")
+    first = EventLog(path, file_capacity=16)
+    first.record(EventType.STARTUP, "ITMl_EQ")
+    first.close()
+    second = EventLog(path, file_capacity=16)
+    second.record(EventType.SESSION_END, "ITMl_EQ")
+    second.close()
+
+    assert [e.type for e in read_events(path)] == [
+        EventType.STARTUP,
+        EventType.SESSION_END,
+    ]
+
+
+def test_cli_filters_by_type_and_symbol(tmp_path, capsys):
+    """The decoder CLI prints only matching events."""
+    path = str(tmp_path / "events.bin")
+    log = EventLog(path, file_capacity=16)
+    log.record(EventType.BAR, "ITMl_EQ", 100.0)
+    log.record(EventType.EXIT, "ITMl_EQ", 102.0, -3.0)
+    log.record(EventType.EXIT, "OTHER_EQ", 50.0, -1.0)
+    log.close()
+
+    eventlog.main([path, "--type", "EXIT", "--symbol", "ITMl_EQ"])
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    assert "EXIT" in lines[0] and "price=102.0000" in lines[0]
+
+
+def test_foreign_file_is_rejected_and_released(tmp_path, monkeypatch):
+    """Opening a file that is not an event log closes it before raising."""
+    path = tmp_path / "events.bin"
+    path.write_bytes(b"\0" * 64)
+    opened = []
+    real_open = open
+
+    def tracking_open(*args, **kwargs):
+        opened.append(real_open(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr("builtins.open", tracking_open)
+
+    with pytest.raises(ValueError, match="not an event log"):
+        EventLog(str(path))
+
+    assert opened and all(handle.closed for handle in opened)
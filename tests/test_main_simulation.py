@@ -0,0 +1,157 @@
+import math
+import time
+from datetime import datetime, timezone
+
+import pytest
+import requests
+
+import main
+from broker import SEED_QTY, Broker
+from clocks import VirtualClock
+from eventlog import EventType, read_events
+from helpers import fake_response
+
+START = datetime(2026, 3, 2, 13, 0, tzinfo=timezone.utc).timestamp()
+OPEN = START + 3600
+CLOSE = OPEN + 6.5 * 3600
+
+
+def _iso(stamp):
+    return datetime.fromtimestamp(stamp, timezone.utc).isoformat().replace(
+        "+00:00", "Z"
+    )
+
+
+class FakeTrading212:
+    """Minimal stand-in for the API whose prices follow the virtual clock."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.quantity = 0.0
+        self.orders = []
+        self.rate_limited = False
+
+    def price(self):
+        elapsed = self.clock.time() - OPEN
+        return 100.0 + 2.0 * math.sin(elapsed / 1800.0)
+
+    def request(self, method, url, json=None, timeout=None):
+        path = url.split("/api/v0", 1)[-1]
+        if path == "/equity/metadata/instruments":
+            return fake_response(
+                200, [{"ticker": main.SYMBOL, "workingScheduleId": 7}]
+            )
+        if path == "/equity/metadata/exchanges":
+            events = [
+                {"date": _iso(OPEN), "type": "OPEN"},
+                {"date": _iso(CLOSE), "type": "CLOSE"},
+            ]
+            return fake_response(
+                200, [{"workingSchedules": [{"id": 7, "timeEvents": events}]}]
+            )
+        if path == "/equity/account/cash":
+            if not self.rate_limited:
+                self.rate_limited = True
+                return fake_response(429, {}, {"Retry-After": "12"})
+            return fake_response(200, {"total": 10_000.0})
+        if path == "/equity/portfolio/ticker":
+            if abs(self.quantity) < 1e-9:
+                return fake_response(404, {})
+            return fake_response(
+                200, {"quantity": self.quantity, "currentPrice": self.price()}
+            )
+        if path == "/equity/orders/market":
+            self.quantity += json["quantity"]
+            self.orders.append((self.clock.time(), json["quantity"]))
+            return fake_response(200, {"id": len(self.orders)})
+        return fake_response(404, {})
+
+
+def test_full_session_runs_in_virtual_time(monkeypatch, tmp_path):
+    """A whole trading day, warmup included, completes without real sleeping."""
+    monkeypatch.chdir(tmp_path)
+    clock = VirtualClock(START)
+    server = FakeTrading212(clock)
+    monkeypatch.setattr(Broker, "prewarm", lambda self, connections=2: 0)
+    monkeypatch.setattr(
+        requests.Session, "request", lambda _, *args, **kw: server.request(*args, **kw)
+    )
+
+    started = time.monotonic()
+    main.run(Broker(clock=clock))
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 5.0
+    assert clock.time() >= CLOSE - (main.NO_NEW_TRADES_MIN + 1) * 60
+    assert server.orders[0][1] == SEED_QTY
+    assert len(server.orders) > 3
+    assert abs(server.quantity) < 1e-9
+    assert 12 in clock.sleeps
+    assert (tmp_path / "trades_log.csv").exists()
+    kinds = [event.type for event in read_events(str(tmp_path / "events.bin"))]
+    assert kinds[0] == EventType.STARTUP
+    assert EventType.RATE_LIMIT in kinds and EventType.ENTRY in kinds
+    assert kinds.count(EventType.BAR) > 300
+
+
+class StubBroker:
+    """Just enough Broker for run() to start up and shut down."""
+
+    def __init__(self, clock):
+        self.time_source = clock
+        self.startup_timings = {"total": 0.01}
+        self.closed_with = None
+
+    def position(self, symbol):
+        return 0.0
+
+    def close(self, drop_seed=True):
+        self.closed_with = drop_seed
+
+
+def test_startup_event_is_spilled_before_waiting_for_open(monkeypatch, tmp_path):
+    """STARTUP reaches the file first; a failing log close hides no errors."""
+    path = str(tmp_path / "events.bin")
+    bkr = StubBroker(VirtualClock(START))
+    events = main.EventLog(path, clock=bkr.time_source)
+    seen = []
+
+    def stop_waiting(_):
+        seen.extend(event.type for event in read_events(path))
+        raise RuntimeError("stop")
+
+    def failing_close():
+        raise OSError("disk gone")
+
+    monkeypatch.setattr(main, "wait_for_open", stop_waiting)
+    monkeypatch.setattr(events, "close", failing_close)
+
+    with pytest.raises(RuntimeError, match="stop"):
+        main.run(bkr, events)
+
+    assert seen == [EventType.STARTUP]
+    assert bkr.closed_with is False
+    main.EventLog.close(events)
+
+
+def test_corrupt_event_log_falls_back_to_memory(monkeypatch, tmp_path, capsys):
+    """A broken event log file does not keep the bot from trading."""
+    path = tmp_path / "events.bin"
+    path.write_bytes(b"not an event log" * 4)
+    monkeypatch.setattr(main, "EVENT_LOG_PATH", str(path))
+    reached = []
+
+    def stop_waiting(_):
+        reached.append(True)
+        raise RuntimeError("stop")
+
+    monkeypatch.setattr(main, "wait_for_open", stop_waiting)
+    bkr = StubBroker(VirtualClock(START))
+
+    with pytest.raises(RuntimeError, match="stop"):
+        main.run(bkr)
+
+    assert reached
+    assert "keeping events in memory" in capsys.readouterr().out
+    assert path.read_bytes() == b"not an event log" * 4
+    assert bkr.closed_with is False
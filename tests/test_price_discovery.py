@@ -0,0 +1,179 @@
+import json
+import threading
+
+import pytest
+import requests
+
+from broker import SEED_QTY, Broker, MarketDataUnavailable
+from clocks import VirtualClock
+from pricing import PriceDiscovery
+
+
+class FakeAccount:
+    """Portfolio endpoint that can hide the position to force rediscovery."""
+
+    def __init__(self):
+        self.quantity = 0.0
+        self.price = 100.0
+        self.hidden = False
+        self.orders = []
+
+    def request(self, method, url, json=None, timeout=None):
+        response = requests.Response()
+        response.status_code = 200
+        body = {}
+        if url.endswith("/equity/orders/market"):
+            self.quantity += json["quantity"]
+            self.orders.append(json["quantity"])
+            body = {"id": len(self.orders)}
+        elif self.hidden or abs(self.quantity) < 1e-9:
+            response.status_code = 404
+        else:
+            body = {"quantity": self.quantity, "currentPrice": self.price}
+        response._content = _dumps(body)
+        return response
+
+
+def _dumps(body):
+    return json.dumps(body).encode()
+
+
+def _broker(monkeypatch, tmp_path, clock):
+    monkeypatch.setattr(Broker, "_load_metadata", lambda self: None)
+    account = FakeAccount()
+    bkr = Broker(clock=clock, state_path=str(tmp_path / "state.json"))
+    monkeypatch.setattr(bkr.session, "request", account.request)
+    return bkr, account
+
+
+def test_missing_position_serves_cached_price_while_seeding(monkeypatch, tmp_path):
+    """After first discovery, a lost position never blocks get_latest_bar."""
+    clock = VirtualClock(1_000_000.0)
+    bkr, account = _broker(monkeypatch, tmp_path, clock)
+
+    first = bkr.get_latest_bar("ITMl_EQ")
+    assert first["close"] == 100.0
+    assert account.orders == [SEED_QTY]
+
+    clock.advance(30)
+    account.quantity = 0.0
+    account.price = 101.0
+    sleeps_before = len(clock.sleeps)
+    cached = bkr.get_latest_bar("ITMl_EQ")
+    assert cached["ts"] == first["ts"]
+    assert cached["close"] == 100.0
+
+    assert bkr.prices.wait("ITMl_EQ", timeout=5)
+    assert account.orders == [SEED_QTY, SEED_QTY]
+    assert len(clock.sleeps) > sleeps_before
+    clock.advance(1)
+    fresh = bkr.get_latest_bar("ITMl_EQ")
+    assert fresh["close"] == 101.0
+    assert fresh["ts"] != first["ts"]
+
+
+def test_stale_cache_raises_without_blocking(monkeypatch, tmp_path):
+    """Prices older than the max age are not served and the loop never waits."""
+    clock = VirtualClock(1_000_000.0)
+    bkr, account = _broker(monkeypatch, tmp_path, clock)
+    bkr.prices.record("ITMl_EQ", 90.0, clock.time() - bkr.prices.max_age - 1)
+    gate = threading.Event()
+    monkeypatch.setattr(bkr, "_ensure_seed", lambda symbol: gate.wait(5) and {})
+
+    with pytest.raises(MarketDataUnavailable, match="No recent price"):
+        bkr.get_latest_bar("ITMl_EQ")
+
+    gate.set()
+    assert bkr.prices.wait("ITMl_EQ", timeout=5)
+
+
+def test_failed_background_seed_is_reported(monkeypatch, tmp_path):
+    """A seed that never shows a position surfaces as an outage once."""
+    clock = VirtualClock(1_000_000.0)
+    bkr, account = _broker(monkeypatch, tmp_path, clock)
+    bkr.get_latest_bar("ITMl_EQ")
+    account.hidden = True
+    clock.advance(1)
+
+    bkr.get_latest_bar("ITMl_EQ")
+    assert bkr.prices.wait("ITMl_EQ", timeout=5)
+    with pytest.raises(MarketDataUnavailable, match="Background seed failed"):
+        bkr.get_latest_bar("ITMl_EQ")
+    assert bkr.prices.pop_error("ITMl_EQ") is None
+
+
+def test_close_waits_for_background_seed(monkeypatch, tmp_path):
+    """An order placed by a seed still running at shutdown is sold back."""
+    clock = VirtualClock(1_000_000.0)
+    bkr, account = _broker(monkeypatch, tmp_path, clock)
+    bkr.get_latest_bar("ITMl_EQ")
+    account.quantity = 0.0
+    clock.advance(1)
+
+    gate = threading.Event()
+    placed = threading.Event()
+    send = account.request
+
+    def slow_order(method, url, json=None, timeout=None):
+        if url.endswith("/equity/orders/market") and json["quantity"] > 0:
+            placed.set()
+            gate.wait(5)
+        return send(method, url, json=json, timeout=timeout)
+
+    monkeypatch.setattr(bkr.session, "request", slow_order)
+    bkr.get_latest_bar("ITMl_EQ")
+    assert placed.wait(5)
+    # The loop sees no position yet; that must not disarm the seed drop.
+    bkr.position("ITMl_EQ")
+    threading.Timer(0.05, gate.set).start()
+
+    bkr.close()
+
+    assert account.orders == [SEED_QTY, SEED_QTY, -SEED_QTY]
+    assert abs(account.quantity) < 1e-9
+    assert not bkr.prices.start_seed("ITMl_EQ")
+
+
+def test_seed_state_survives_restart(monkeypatch, tmp_path):
+    """A kept seed and its last price are reloaded by the next process."""
+    clock = VirtualClock(1_000_000.0)
+    bkr, account = _broker(monkeypatch, tmp_path, clock)
+    bkr.get_latest_bar("ITMl_EQ")
+    seen_at = clock.time()
+    bkr.close(drop_seed=False)
+    assert account.orders == [SEED_QTY]
+
+    restored = PriceDiscovery(lambda ticker: {}, clock, str(tmp_path / "state.json"))
+    assert restored.seeded("ITMl_EQ")
+    assert restored.last_known("ITMl_EQ") == (100.0, seen_at)
+
+    bkr.close()
+    assert account.orders == [SEED_QTY, -SEED_QTY]
+    assert not PriceDiscovery(
+        lambda ticker: {}, clock, str(tmp_path / "state.json")
+    ).seeded("ITMl_EQ")
+
+
+def test_restart_with_stale_price_discovers_directly(monkeypatch, tmp_path):
+    """An old persisted price does not turn the first lookup into an outage."""
+    clock = VirtualClock(1_000_000.0)
+    bkr, _ = _broker(monkeypatch, tmp_path, clock)
+    bkr.get_latest_bar("ITMl_EQ")
+    bkr.close()
+    clock.advance(3600)
+
+    restarted, account = _broker(monkeypatch, tmp_path, clock)
+    bar = restarted.get_latest_bar("ITMl_EQ")
+
+    assert bar["close"] == 100.0
+    assert account.orders == [SEED_QTY]
+
+
+def test_unwritable_seed_state_keeps_seed_active(monkeypatch, tmp_path):
+    """A failed state write after the seed order does not lose the seed."""
+    clock = VirtualClock(1_000_000.0)
+    bkr, account = _broker(monkeypatch, tmp_path / "missing", clock)
+
+    assert bkr.get_latest_bar("ITMl_EQ")["close"] == 100.0
+    assert bkr.seed_active
+    assert account.orders == [SEED_QTY]
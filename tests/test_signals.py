@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from helpers import loop_trades, random_walk
+from signals import confirmation_runs, entry_mask, first_exit, simulate
+from strategy import WINDOW, entry_signal
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_simulate_matches_bar_by_bar(seed):
+    """The batch path takes exactly the trades the live rules would take."""
+    closes = random_walk(seed)
+    assert simulate(closes) == loop_trades(closes)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_entry_mask_matches_on_exact_ties(seed):
+    """Prices sitting exactly on the SMA resolve the same way as the loop."""
+    rng = np.random.default_rng(seed)
+    closes = rng.integers(98, 102, 300).astype(float).tolist()
+    mask = entry_mask(closes, discount=0.0)
+    expected = [entry_signal(closes[: i + 1], WINDOW, 0.0) for i in range(len(closes))]
+    assert mask.tolist() == expected
+
+
+def test_entry_mask_runs_per_instrument_row():
+    """A 2-D input evaluates each instrument independently."""
+    rows = np.array([random_walk(1, 200), random_walk(2, 200)])
+    mask = entry_mask(rows)
+    assert mask[0].tolist() == entry_mask(rows[0]).tolist()
+    assert mask[1].tolist() == entry_mask(rows[1]).tolist()
+
+
+def test_confirmation_runs_counts_consecutive_hits():
+    """Run lengths reset to zero on every miss."""
+    runs = confirmation_runs([True, True, False, True, True, True, False])
+    assert runs.tolist() == [1, 2, 0, 1, 2, 3, 0]
+
+
+def test_first_exit_carries_loss_run_across_chunks():
+    """A soft-stop run that straddles a scan chunk boundary still confirms."""
+    closes = [100.0] * 255 + [90.0] * 3 + [100.0] * 10
+    assert first_exit(closes, 0, confirm_polls=3) == (257, "soft_stop")
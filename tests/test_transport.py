@@ -0,0 +1,184 @@
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from broker import Broker
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the Trading 212 API used to exercise the transport."""
+
+    protocol_version = "HTTP/1.1"
+    hits = []
+    failures = {}
+    failure_status = 503
+    delays = {}
+    connect_delay = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        # Stands in for TCP/TLS setup cost, paid once per new connection.
+        time.sleep(self.connect_delay)
+        super().setup()
+
+    def _reply(self):
+        path = self.path.split("/api/v0", 1)[-1]
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        type(self).hits.append(path)
+        if self.failures.get(path, 0) > 0:
+            self.failures[path] -= 1
+            self._send(self.failure_status, b"{}")
+            return
+        time.sleep(self.delays.get(path, 0.0))
+        body = json.dumps({"total": 1234.5, "pad": "x" * 4000}).encode()
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            self._send(200, gzip.compress(body), {"Content-Encoding": "gzip"})
+        else:
+            self._send(200, body)
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up after its read timeout
+
+    do_GET = _reply
+    do_POST = _reply
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    StandInHandler.hits = []
+    StandInHandler.failures = {}
+    StandInHandler.failure_status = 503
+    StandInHandler.delays = {}
+    StandInHandler.connect_delay = 0.0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(Broker, "_load_metadata", lambda self: None)
+    bkr = Broker()
+    bkr.base_url = f"http://127.0.0.1:{server.server_port}/api/v0"
+    yield bkr
+    bkr.close(drop_seed=False)
+    server.shutdown()
+    server.server_close()
+
+
+def test_prewarm_connects_without_requests(stand_in):
+    """Pre-warming opens pooled connections that later requests reuse."""
+    assert stand_in.prewarm(connections=2) == 2
+    assert StandInHandler.hits == []
+
+    for _ in range(3):
+        stand_in._req("GET", "/equity/account/cash", fresh=True)
+
+    pool = stand_in.transport_stats()["pool"]
+    assert pool["connections"] == 2
+    assert pool["requests"] == 3
+
+
+def test_prewarm_lowers_p95_latency(stand_in):
+    """Connection setup is paid before the first request, not during it."""
+    StandInHandler.connect_delay = 0.2
+    warm = Broker()
+    warm.base_url = stand_in.base_url
+    try:
+        assert warm.prewarm(connections=1) == 1
+        time.sleep(0.3)
+        for bkr in (stand_in, warm):
+            for _ in range(5):
+                bkr._req("GET", "/equity/account/cash", fresh=True)
+
+        endpoint = "GET /equity/account/cash"
+        cold = stand_in.transport_stats()["endpoints"][endpoint]["p95_ms"]
+        warmed = warm.transport_stats()["endpoints"][endpoint]["p95_ms"]
+    finally:
+        warm.close(drop_seed=False)
+
+    assert cold >= 200.0
+    assert warmed < cold / 2
+
+
+def test_hidden_retries_are_counted(stand_in):
+    """urllib3 retries on 5xx show up in the endpoint stats."""
+    StandInHandler.failures["/equity/account/cash"] = 2
+
+    assert stand_in.get_equity() == 1234.5
+
+    stats = stand_in.transport_stats()["endpoints"]["GET /equity/account/cash"]
+    assert stats["requests"] == 1
+    assert stats["retries"] == 2
+    assert StandInHandler.hits.count("/equity/account/cash") == 3
+
+
+def test_compressed_responses_record_wire_and_body_size(stand_in):
+    """Gzip bodies are decoded while the smaller wire size is tracked."""
+    stand_in.get_equity()
+
+    stats = stand_in.transport_stats()["endpoints"]["GET /equity/account/cash"]
+    assert stats["body_bytes"] > 4000
+    assert 0 < stats["wire_bytes"] < stats["body_bytes"]
+    assert stats["p50_ms"] > 0
+
+
+def test_read_timeout_is_per_endpoint(stand_in):
+    """A slow endpoint fails on its own read timeout instead of the default."""
+    StandInHandler.delays["/equity/account/slow"] = 0.5
+    stand_in.transport.timeouts["/equity/account/slow"] = (1.0, 0.1)
+    adapter = stand_in.transport.adapter
+    adapter.max_retries = adapter.max_retries.new(total=0)
+
+    with pytest.raises(requests.ConnectionError, match="read timeout=0.1"):
+        stand_in._req("GET", "/equity/account/slow")
+
+    stats = stand_in.transport_stats()["endpoints"]["GET /equity/account/slow"]
+    assert stats["errors"] == 1
+
+
+def test_timed_out_order_is_not_resent(stand_in):
+    """A lost order response surfaces once; the order is never sent twice."""
+    StandInHandler.delays["/equity/orders/market"] = 0.5
+    stand_in.transport.timeouts["/equity/orders/market"] = (1.0, 0.1)
+
+    with pytest.raises(requests.ReadTimeout):
+        stand_in.place_order("ITMl_EQ", "buy", 1)
+
+    assert StandInHandler.hits.count("/equity/orders/market") == 1
+
+
+@pytest.mark.parametrize("status", [502, 504])
+def test_order_gateway_errors_are_not_resent(stand_in, status):
+    """A 5xx on an order may hide a placed order; it is reported, not retried."""
+    StandInHandler.failures["/equity/orders/market"] = 2
+    StandInHandler.failure_status = status
+
+    with pytest.raises(requests.HTTPError, match=str(status)):
+        stand_in.place_order("ITMl_EQ", "buy", 1)
+
+    assert StandInHandler.hits.count("/equity/orders/market") == 1
+
+
+def test_rate_limited_order_is_retried(stand_in):
+    """A 429 rejects the order outright, so sending it again is safe."""
+    StandInHandler.failures["/equity/orders/market"] = 1
+    StandInHandler.failure_status = 429
+
+    stand_in.place_order("ITMl_EQ", "buy", 1)
+
+    assert StandInHandler.hits.count("/equity/orders/market") == 2
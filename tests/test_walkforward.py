@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from helpers import loop_trades, random_walk
+from signals import entry_mask, trades_from_mask
+from walkforward import (
+    Params,
+    make_folds,
+    param_grid,
+    segment_returns,
+    walk_forward,
+)
+
+GRID = [
+    Params(20, 0.0025, 0.008),
+    Params(24, 0.001, 0.004),
+    Params(30, 0.005, 0.012),
+]
+
+
+def test_make_folds_roll_by_test_length():
+    """Folds tile the history with back-to-back test windows."""
+    assert make_folds(1000, 400, 200) == [
+        (0, 400, 600),
+        (200, 600, 800),
+        (400, 800, 1000),
+    ]
+
+
+def test_param_grid_derives_windows_from_slow():
+    """Slow settings under 20 collapse onto the minimum SMA window."""
+    windows = {params.window for params in param_grid(slows=(12, 18, 24))}
+    assert windows == {20, 24}
+
+
+def test_segment_returns_follow_held_bars():
+    """Returns accrue only while a trade is open, marked at the segment end."""
+    closes = [100.0, 101.0, 102.0, 101.0, 103.0]
+    returns = segment_returns(closes, [(1, 2, "take_profit"), (3, None, None)], 0, 5)
+    assert returns.tolist() == pytest.approx([0.0, 102 / 101 - 1, 0.0, 103 / 101 - 1])
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_fold_trades_match_flat_start_replay(seed):
+    """A fold trades exactly as the live loop would starting flat at its start."""
+    closes = random_walk(seed, 1500)
+    for params in GRID:
+        mask = entry_mask(closes, params.window, params.discount)
+        for start, stop in [(0, 500), (137, 900), (500, 1000), (1000, 1500)]:
+            trades = trades_from_mask(closes, mask, start, stop, params.loss_pct)
+            assert trades == _replay(closes, params, start, stop)
+
+
+@pytest.mark.parametrize("seed", [3, 7, 11])
+def test_folds_pick_best_train_params_and_stitch_test_returns(seed):
+    """Each fold trades the train-optimal params; the curve compounds tests."""
+    closes = random_walk(seed, 3000)
+
+    result = walk_forward(closes, 1000, 500, grid=GRID, workers=1)
+
+    assert len(result.folds) == 4
+    for fold in result.folds:
+        scores = [
+            np.prod(
+                1.0
+                + segment_returns(
+                    closes, _replay(closes, params, *fold.train), *fold.train
+                )
+            )
+            - 1.0
+            for params in GRID
+        ]
+        assert fold.train_return == pytest.approx(max(scores))
+        assert fold.params == GRID[int(np.argmax(scores))]
+    expected = np.prod([1.0 + fold.test_return for fold in result.folds])
+    assert result.equity[-1] == pytest.approx(expected)
+    assert result.equity.size == result.index.size
+    assert result.index[0] == 1000 and result.index[-1] == 2999
+
+
+def test_parallel_folds_match_serial():
+    """Running folds in worker processes does not change the outcome."""
+    closes = random_walk(5, 2400)
+
+    serial = walk_forward(closes, 800, 400, grid=GRID, workers=1)
+    parallel = walk_forward(closes, 800, 400, grid=GRID, workers=2)
+
+    assert [f.params for f in parallel.folds] == [f.params for f in serial.folds]
+    assert np.array_equal(parallel.equity, serial.equity)
+
+
+def _replay(closes, params, start, stop):
+    return loop_trades(
+        closes, params.window, params.discount, params.loss_pct, start, stop
+    )
@@ -0,0 +1,206 @@
+"""HTTP transport for the broker: timeouts, pooling, pre-warming and stats."""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError, MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+# (connect, read) seconds. Connects should be fast; only the instruments
+# payload legitimately takes long to read.
+DEFAULT_TIMEOUT = (3.05, 10.0)
+ENDPOINT_TIMEOUTS = {
+    "/equity/metadata/instruments": (3.05, 30.0),
+    "/equity/metadata/exchanges": (3.05, 15.0),
+    "/equity/orders/market": (3.05, 10.0),
+    "/equity/portfolio/ticker": (3.05, 5.0),
+    "/equity/account/cash": (3.05, 5.0),
+}
+# Largest number of concurrent requests the broker makes: fast-start metadata
+# and snapshot fetches, plus the loop and a background seed.
+POOL_MAXSIZE = 4
+LATENCY_SAMPLES = 512
+# Requests that must never be re-sent once they may have reached the
+# server: after a read error or a 5xx the order may already be placed, and a
+# retry could place a duplicate. Only a 429, which rejects the request, is
+# retried.
+NO_RESEND_PATHS = ("/equity/orders/market",)
+
+
+class EndpointRetry(Retry):
+    """``Retry`` that never re-sends ``NO_RESEND_PATHS`` except after a 429."""
+
+    def increment(
+        self,
+        method=None,
+        url=None,
+        response=None,
+        error=None,
+        _pool=None,
+        _stacktrace=None,
+    ):
+        if urlsplit(url or "").path.endswith(NO_RESEND_PATHS):
+            if error is not None and self._is_read_error(error):
+                raise error.with_traceback(_stacktrace)
+            if response is not None and response.status != 429:
+                # With raise_on_status off, urllib3 hands back this response.
+                raise MaxRetryError(
+                    _pool, url, ResponseError(f"not re-sent after {response.status}")
+                )
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+@dataclass
+class EndpointStats:
+    """Per-endpoint request counters and recent latencies."""
+
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0
+    wire_bytes: int = 0
+    body_bytes: int = 0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies)
+
+        def pct(q):
+            if not ordered:
+                return 0.0
+            return ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000.0
+
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "wire_bytes": self.wire_bytes,
+            "body_bytes": self.body_bytes,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": ordered[-1] * 1000.0 if ordered else 0.0,
+        }
+
+
+class Transport:
+    """A pooled ``requests`` session that records what each call really cost."""
+
+    def __init__(self, pool_maxsize: int = POOL_MAXSIZE, timeouts=None):
+        self.timeouts = dict(ENDPOINT_TIMEOUTS if timeouts is None else timeouts)
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=pool_maxsize,
+            max_retries=EndpointRetry(
+                total=5,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods={"GET", "POST", "DELETE"},
+                # Return the final response so Broker reports it, e.g. a
+                # lasting 429 as RateLimitError rather than a RetryError.
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def timeout_for(self, path: str) -> tuple[float, float]:
+        return self.timeouts.get(path, DEFAULT_TIMEOUT)
+
+    def request(self, method, url, path, *, json=None):
+        started = time.perf_counter()
+        try:
+            resp = self.session.request(
+                method, url, json=json, timeout=self.timeout_for(path)
+            )
+        except requests.RequestException:
+            with self._lock:
+                self._stats_for(method, path).errors += 1
+            raise
+        self._observe(method, path, resp, time.perf_counter() - started)
+        return resp
+
+    def _stats_for(self, method, path) -> EndpointStats:
+        key = f"{method.upper()} {path}"
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = EndpointStats()
+        return stats
+
+    def _observe(self, method, path, resp, elapsed):
+        body = len(resp.content or b"")
+        raw = resp.raw
+        history = getattr(getattr(raw, "retries", None), "history", ())
+        tell = getattr(raw, "tell", None)
+        wire = tell() if callable(tell) else body
+        with self._lock:
+            stats = self._stats_for(method, path)
+            stats.requests += 1
+            stats.retries += len(history)
+            stats.body_bytes += body
+            stats.wire_bytes += wire
+            stats.latencies.append(elapsed)
+
+    def warm(self, url: str, connections: int = 2) -> int:
+        """Open up to ``connections`` pooled connections to ``url``'s host.
+
+        DNS, TCP and TLS setup happen now instead of on the first trading
+        call; no API request is sent. Returns the number opened.
+        """
+        # Resolve verify/cert/proxies exactly as Session.request does so the
+        # warmed connections land in the pool real requests will use.
+        settings = self.session.merge_environment_settings(url, {}, None, None, None)
+        prepared = requests.Request("GET", url).prepare()
+        pool = self.adapter.get_connection_with_tls_context(
+            prepared,
+            verify=settings["verify"],
+            proxies=settings["proxies"],
+            cert=settings["cert"],
+        )
+        # urllib3 has no public pre-connect hook; borrow connections from the
+        # pool, connect them, and hand them back for the next requests.
+        borrowed = []
+        opened = 0
+        try:
+            for _ in range(connections):
+                conn = pool._get_conn()
+                borrowed.append(conn)
+                if getattr(conn, "sock", None) is None:
+                    conn.connect()
+                opened += 1
+        except (OSError, HTTPError):
+            pass
+        finally:
+            for conn in borrowed:
+                pool._put_conn(conn)
+        return opened
+
+    def connection_stats(self) -> dict:
+        """Connections opened and requests served across all pools.
+
+        Requests beyond the connection count were served on kept-alive
+        connections.
+        """
+        opened = served = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            served += pool.num_requests
+        return {"connections": opened, "requests": served}
+
+    def stats(self) -> dict:
+        with self._lock:
+            endpoints = {key: s.summary() for key, s in self._stats.items()}
+        return {"endpoints": endpoints, "pool": self.connection_stats()}
+
+    def close(self):
+        self.session.close()
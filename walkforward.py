@@ -0,0 +1,171 @@
+"""Walk-forward tuning of the strategy with a stitched out-of-sample curve.
+
+Entry masks for every ``(window, discount)`` pair are computed once over the
+whole history, so each fold starts with the SMA state the previous bars left
+behind instead of re-warming it. Folds then run in parallel worker processes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import product
+
+import numpy as np
+
+from config import LOSS_CONFIRM_POLLS, TP_R_MULT
+from signals import entry_mask, trades_from_mask
+from strategy import window_for
+
+SLOW_GRID = (12, 18, 24, 30)
+DISCOUNT_GRID = (0.001, 0.0025, 0.005)
+LOSS_GRID = (0.004, 0.008, 0.012)
+
+
+@dataclass(frozen=True)
+class Params:
+    window: int
+    discount: float
+    loss_pct: float
+
+
+@dataclass
+class FoldResult:
+    train: tuple[int, int]
+    test: tuple[int, int]
+    params: Params
+    train_return: float
+    test_return: float
+    trades: list = field(default_factory=list)
+    returns: np.ndarray = field(default_factory=lambda: np.zeros(0), repr=False)
+
+
+@dataclass
+class WalkForwardResult:
+    folds: list[FoldResult]
+    equity: np.ndarray
+    index: np.ndarray
+
+
+def param_grid(slows=SLOW_GRID, discounts=DISCOUNT_GRID, losses=LOSS_GRID):
+    """Return the unique parameter sets, with windows derived from ``SLOW``."""
+    windows = sorted({window_for(slow) for slow in slows})
+    return [Params(*combo) for combo in product(windows, discounts, losses)]
+
+
+def make_folds(n_bars: int, train_bars: int, test_bars: int, step: int | None = None):
+    """Return ``(train_start, test_start, test_stop)`` for each rolling fold."""
+    step = test_bars if step is None else step
+    folds = []
+    start = 0
+    while start + train_bars + test_bars <= n_bars:
+        folds.append((start, start + train_bars, start + train_bars + test_bars))
+        start += step
+    return folds
+
+
+def segment_returns(closes, trades, start: int, stop: int) -> np.ndarray:
+    """Per-bar returns over ``[start, stop)``, flat outside of trades.
+
+    A trade still open at ``stop`` is marked to the last close of the segment.
+    """
+    values = np.asarray(closes, dtype=float)[start:stop]
+    held = np.zeros(values.size, dtype=bool)
+    for entry, exit_idx, _ in trades:
+        end = stop - 1 if exit_idx is None else exit_idx
+        held[entry - start : end - start] = True
+    steps = values[1:] / values[:-1] - 1.0
+    return np.where(held[:-1], steps, 0.0)
+
+
+_closes = None
+_masks = None
+_exits = None
+
+
+def _init_worker(closes, masks, exits):
+    global _closes, _masks, _exits
+    _closes, _masks, _exits = closes, masks, exits
+
+
+def _evaluate(params: Params, start: int, stop: int):
+    tp_mult, confirm_polls = _exits
+    trades = trades_from_mask(
+        _closes,
+        _masks[params.window, params.discount],
+        start,
+        stop,
+        params.loss_pct,
+        tp_mult,
+        confirm_polls,
+    )
+    returns = segment_returns(_closes, trades, start, stop)
+    return trades, returns, float(np.prod(1.0 + returns) - 1.0)
+
+
+def _run_fold(fold, grid):
+    train_start, test_start, test_stop = fold
+    best = None
+    for params in grid:
+        score = _evaluate(params, train_start, test_start)[2]
+        if best is None or score > best[1]:
+            best = (params, score)
+    trades, returns, test_return = _evaluate(best[0], test_start, test_stop)
+    return FoldResult(
+        (train_start, test_start),
+        (test_start, test_stop),
+        best[0],
+        best[1],
+        test_return,
+        trades,
+        returns,
+    )
+
+
+def walk_forward(
+    closes,
+    train_bars: int,
+    test_bars: int,
+    step: int | None = None,
+    grid=None,
+    workers: int | None = None,
+    tp_mult=TP_R_MULT,
+    confirm_polls=LOSS_CONFIRM_POLLS,
+) -> WalkForwardResult:
+    """Tune on each train fold, trade the next test fold, stitch the results.
+
+    ``workers=1`` runs folds in-process; otherwise a process pool is used.
+    The returned equity starts at 1.0 on the first test bar and ``index``
+    holds the bar index of each point.
+    """
+    if step is not None and step < test_bars:
+        raise ValueError("Test folds would overlap; step must be >= test_bars.")
+    values = np.ascontiguousarray(closes, dtype=float)
+    grid = param_grid() if grid is None else list(grid)
+    masks = {
+        key: entry_mask(values, *key)
+        for key in {(params.window, params.discount) for params in grid}
+    }
+    folds = make_folds(values.size, train_bars, test_bars, step)
+    exits = (tp_mult, confirm_polls)
+    if workers == 1 or len(folds) <= 1:
+        _init_worker(values, masks, exits)
+        try:
+            results = [_run_fold(fold, grid) for fold in folds]
+        finally:
+            _init_worker(None, None, None)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(values, masks, exits),
+        ) as pool:
+            results = list(pool.map(_run_fold, folds, [grid] * len(folds)))
+
+    returns = [fold.returns for fold in results]
+    index = [np.arange(fold.test[0], fold.test[1]) for fold in results]
+    stitched = np.concatenate(returns) if returns else np.zeros(0)
+    equity = np.cumprod(np.concatenate(([1.0], 1.0 + stitched)))
+    # One point per return plus the first test bar; positions are flat
+    # between folds, so bars skipped at fold boundaries add no return.
+    points = np.concatenate([idx[1:] for idx in index]) if index else np.zeros(0)
+    first = index[0][:1] if index else np.zeros(0, dtype=int)
+    return WalkForwardResult(results, equity, np.concatenate((first, points)))